@@ -0,0 +1,94 @@
+"""
+Load the images of the `resources` folder once per process.
+
+`AssetCache` keeps every image it loads, for pygame (as surfaces, along with
+their scaled variants) and for pyglet, so creating many sprites of the same
+image (e.g. a queen for every placement in `backtracking.py`) neither decodes
+nor rescales the image again.
+
+NOTE pygame and pyglet are only imported when an image is first requested for
+them, so the pyglet scripts do not depend on pygame (and vice versa).
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import os
+
+# The resources folder of the repository, wherever the scripts are run from
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources")
+
+
+class AssetCache:
+    """
+    Cache the images found in `directory`, by file name.
+
+    pygame surfaces are keyed by the file name and the size they are scaled to
+    (None for the original size). Once the display is open, the surfaces are
+    converted to its pixel format, so blitting them is fast; the ones loaded
+    before that are converted the first time they are requested afterwards.
+    """
+
+    def __init__(self, directory=RESOURCES):
+        self.directory = directory
+        self._surfaces = {}
+        # Whether the surfaces of `_surfaces` are converted to the display format
+        self._converted = {}
+        self._pyglet_images = {}
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def surface(self, name, size=None):
+        """
+        Return the image `name` as a pygame surface, scaled to `size` (a
+        (width, height) pair) if given.
+
+        The surface is shared by every caller: draw it, but do not draw on it.
+        """
+        import pygame
+
+        if size is not None:
+            size = tuple(size)
+        key = (name, size)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if size is None:
+                surface = pygame.image.load(self.path(name))
+            else:
+                surface = pygame.transform.scale(self.surface(name), size)
+            self._converted[key] = False
+        if not self._converted[key] and pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+            self._converted[key] = True
+        self._surfaces[key] = surface
+        return surface
+
+    def pyglet_image(self, name, centered=False):
+        """
+        Return the image `name` as a pyglet image, with its anchor at its center
+        if `centered` (e.g. to rotate or place sprites by their center).
+
+        Like the pygame surfaces, the image is shared by every caller.
+        """
+        import pyglet
+
+        key = (name, centered)
+        image = self._pyglet_images.get(key)
+        if image is None:
+            image = pyglet.image.load(self.path(name))
+            if centered:
+                image.anchor_x = image.width // 2
+                image.anchor_y = image.height // 2
+            self._pyglet_images[key] = image
+        return image
+
+    def clear(self):
+        self._surfaces.clear()
+        self._converted.clear()
+        self._pyglet_images.clear()
+
+
+# Shared by all scripts
+assets = AssetCache()
@@ -7,8 +7,17 @@ __license__ = "MIT"
 __email__ = "ahmedhassan@aims.ac.za"
 
 
+import math
 import pygame
 import sys
+import time
+
+from assets import assets
+
+# The steps of the search (see `QueenPuzzle._search`)
+PROBE = 0
+PLACE = 1
+BACKTRACK = 2
 
 
 class QueenPuzzle:
@@ -18,9 +27,13 @@ class QueenPuzzle:
     The class animates the steps of the backtracking technique.
     """
 
-    def __init__(self, nQueens, width=600, height=600, speed=2):
+    def __init__(self, nQueens, width=600, height=600, speed=2, duration=None):
         """
         Initialize the class and pygame
+
+        If `duration` (in seconds) is given, the animation only draws every
+        k-th step of the search, with k adapted so that it lasts about
+        `duration` seconds (see `_skip_frames`).
         """
 
         pygame.init()
@@ -33,8 +46,14 @@ class QueenPuzzle:
         pygame.display.set_caption("Backtracking: Queen Puzzle")
         # Size of each square in the chessboard.
         self.square_size = width // self.nQueens
-        # Chessboard as a two-dimensional array.
+        # Chessboard as a two-dimensional array of squares (pygame.Rect), and the
+        # board drawn once on a surface of the size of the screen. Both are
+        # built by `_build_chessboard`, again if the screen is resized.
         self.chessboard = []
+        self.board_surface = None
+        # The translucent row highlights, yellow (forward) and red (backward),
+        # created once and reused for every highlighted row.
+        self.row_overlays = {}
         # The queen that is to be placed for this iteration.
         self.current_queen = Queen(self.square_size, self.square_size)
         # All queens that have been placed so far.
@@ -44,23 +63,44 @@ class QueenPuzzle:
         # We use gueens_group since it is easy to draw all queens at once
         # You could have used a list without the group and draws all queens by using a loop.
         self.queens_list = []
+        # Columns and diagonals under attack, as bitmasks: bit c of `columns` is
+        # set if a queen is in column c, bit (col - row + nQueens - 1) of
+        # `diagonals` if a queen is on that down-right diagonal, and bit
+        # (row + col) of `anti_diagonals` if a queen is on that down-left one.
+        self.columns = 0
+        self.diagonals = 0
+        self.anti_diagonals = 0
+        # The queen in every column and on every diagonal (or None), to find the
+        # queen a conflict is with without scanning all placed queens
+        self.column_queens = [None] * nQueens
+        self.diagonal_queens = [None] * (2 * nQueens - 1)
+        self.anti_diagonal_queens = [None] * (2 * nQueens - 1)
         # The speed of animation (rate of frames per second)
         self.speed = speed
+        # Target duration of the animation (None to draw every step), the
+        # number of steps per frame drawn, k, and the fewest frames left to
+        # draw once the duration is over
+        self.duration = duration
+        self.steps_per_frame = 1
+        self.min_frames = 20
 
-    def _draw_chessboard_and_queens(self):
+    def _build_chessboard(self):
         """
-        Draw the chessboard and the queens placed so far.
+        Compute the squares of the chessboard and draw it on `board_surface`.
         """
         # Square color.
         WHITE = pygame.Color("white")
         BLACK = pygame.Color("darkgray")
+        self.width, self.height = self.screen.get_size()
+        self.square_size = self.width // self.nQueens
+        self.board_surface = pygame.Surface((self.width, self.height)).convert()
         # Chessboard.
         self.chessboard = []
         color = WHITE
         for r in range(self.nQueens):
             # If the number of queens is even, we need to alternate the colors
             # of the first square in each row
-            if nQueens % 2 == 0:
+            if self.nQueens % 2 == 0:
                 color = WHITE if color == BLACK else BLACK
             y = r * self.square_size
             row = []
@@ -68,10 +108,36 @@ class QueenPuzzle:
                 x = c * self.square_size
                 rect = pygame.Rect(x, y, self.square_size, self.square_size)
                 row.append(rect)
-                self.screen.fill(color, rect)
+                self.board_surface.fill(color, rect)
                 color = WHITE if color == BLACK else BLACK
             self.chessboard.append(row)
 
+        # The row highlights span the whole width of the board.
+        self.row_overlays = {}
+        for backtrack, color in ((False, "yellow"), (True, "red")):
+            surface = pygame.Surface((self.width, self.square_size))
+            surface.set_alpha(125)
+            surface.fill(pygame.Color(color))
+            self.row_overlays[backtrack] = surface
+
+        # Fit the queens to the squares (they only differ after a resize).
+        size = (self.square_size, self.square_size)
+        for queen in self.queens_list + [self.current_queen]:
+            if queen.image.get_size() != size:
+                queen.image = assets.surface("queen.png", size)
+                square = self.chessboard[queen.row][queen.col]
+                queen.rect = queen.image.get_rect(center=square.center)
+
+    def _draw_chessboard_and_queens(self):
+        """
+        Draw the chessboard and the queens placed so far.
+        """
+        if self.board_surface is None or (
+            self.board_surface.get_size() != self.screen.get_size()
+        ):
+            self._build_chessboard()
+        self.screen.blit(self.board_surface, (0, 0))
+
         # Draw all queens at once.
         self.queens_group.draw(self.screen)
 
@@ -96,7 +162,6 @@ class QueenPuzzle:
         square = self.chessboard[row][col]
         pos = (square.centerx, square.centery)
         self.current_queen.update(pos, row, col)
-        self.current_queen.blitme(self.screen)
 
     def _place_queen(self, row, col):
         """
@@ -108,12 +173,12 @@ class QueenPuzzle:
         self.current_queen.update(pos, row, col)
         self.queens_group.add(self.current_queen)
         self.queens_list.append(self.current_queen)
+        self._occupy(self.current_queen, self.current_queen)
         self.current_queen = Queen(self.square_size, self.square_size)
         if row + 1 < len(self.chessboard[0]):
             square = self.chessboard[row + 1][0]
         pos = (square.centerx, square.centery)
         self.current_queen.update(pos, row, col)
-        self.current_queen.blitme(self.screen)
 
     def _remove_queen(self):
         """
@@ -121,6 +186,54 @@ class QueenPuzzle:
         """
         queen = self.queens_list.pop()
         self.queens_group.remove(queen)
+        self._occupy(queen, None)
+
+    def _occupy(self, queen, occupant):
+        """
+        Mark the column and the diagonals of `queen` as attacked by `occupant`,
+        or as free if `occupant` is None.
+        """
+        diagonal = queen.col - queen.row + self.nQueens - 1
+        anti_diagonal = queen.row + queen.col
+        self.column_queens[queen.col] = occupant
+        self.diagonal_queens[diagonal] = occupant
+        self.anti_diagonal_queens[anti_diagonal] = occupant
+        if occupant is None:
+            self.columns &= ~(1 << queen.col)
+            self.diagonals &= ~(1 << diagonal)
+            self.anti_diagonals &= ~(1 << anti_diagonal)
+        else:
+            self.columns |= 1 << queen.col
+            self.diagonals |= 1 << diagonal
+            self.anti_diagonals |= 1 << anti_diagonal
+
+    def _find_conflict(self, row, col):
+        """
+        Return the queen threatening the square (row, col), or None if it is safe.
+
+        If several queens threaten the square, return the one placed first
+        (i.e. in the top-most row).
+        """
+        diagonal = col - row + self.nQueens - 1
+        anti_diagonal = row + col
+        attacked = (
+            self.columns >> col
+            | self.diagonals >> diagonal
+            | self.anti_diagonals >> anti_diagonal
+        ) & 1
+        if not attacked:
+            return None
+        conflicting_queen = None
+        for queen in (
+            self.column_queens[col],
+            self.diagonal_queens[diagonal],
+            self.anti_diagonal_queens[anti_diagonal],
+        ):
+            if queen is not None and (
+                conflicting_queen is None or queen.row < conflicting_queen.row
+            ):
+                conflicting_queen = queen
+        return conflicting_queen
 
     def _highlight_conflict(self, row1, col1, row2, col2):
         """
@@ -147,50 +260,127 @@ class QueenPuzzle:
         if row < 0 or row >= self.nQueens:
             return
         # Highlight color. Either yellow (forward) or red (backward).
-        color = pygame.Color("red") if backtrack else pygame.Color("yellow")
         rect = self.chessboard[row][0]
-        surface_rect = pygame.Rect(0, 0, self.width, self.square_size)
-        surface_rect.left = rect.left
-        surface_rect.top = rect.top
-        surface = pygame.Surface((self.width, self.square_size))
-        surface.set_alpha(125)
-        surface.fill(color)
-        # Draw the surface on the screen
-        self.screen.blit(surface, surface_rect)
+        # Draw the overlay of the color on the screen
+        self.screen.blit(self.row_overlays[backtrack], rect.topleft)
 
-    def _find_position(self, row, start, clock):
+    def _find_position(self, row, start):
         """
         Find a position for the queen.
+
+        Yield a probe step for every column tried, and return the column found
+        (or -1 if the queen cannot be placed in this row).
         """
         # Check all available columns
         for col in range(start, self.nQueens):
-            conflicting_queen = None
-            # Check all placed queens for conflict
-            for queen in self.queens_list:
-                # Check for events, e.g. if the user wants to quit
-                self._check_events()
-                qrow = queen.row
-                qcol = queen.col
-                same_col = qcol == col  # same column
-                bottom_left_diag = qcol == col - (row - qrow)  # bottom left diagonal
-                bottom_right_diag = qcol == col + (row - qrow)  # bottom right diagonal
-                if same_col or bottom_left_diag or bottom_right_diag:
-                    conflicting_queen = queen
-                    break
+            conflicting_queen = self._find_conflict(row, col)
+            yield PROBE, row, col, conflicting_queen
+            if conflicting_queen is None:
+                return col
+        return -1
+
+    def _search(self):
+        """
+        Use the backtracking to solve the puzzle, without drawing anything.
+
+        Yield the steps of the search as they happen, after the placed queens
+        are updated (before the queen is removed, for a backtrack):
+            1. (PROBE, row, col, conflicting_queen): the current queen is tried
+            in (row, col). `conflicting_queen` threatens it, or is None if the
+            queen can be placed there.
+            2. (PLACE, row, col): the current queen is placed in (row, col).
+            3. (BACKTRACK, row, col): the queen in (row, col) is removed, since
+            no queen can be placed in the next row.
+        """
+        current_row = 0
+        start = 0  # the column from which we start
+        while current_row >= 0 and current_row < self.nQueens:
+            # Find a position for the current queen
+            col = yield from self._find_position(current_row, start)
+            # If a position is found
+            if col != -1:
+                self._place_queen(current_row, col)  # Place the queen
+                yield PLACE, current_row, col
+                current_row += 1  # Move to next row
+                start = 0  # Start from the first column
+            else:
+                current_row -= 1
+                # If the puzzle cannot be solved, current_row becomes negative
+                if current_row >= 0:
+                    queen = self.queens_list[-1]
+                    yield BACKTRACK, current_row, queen.col
+                    start = queen.col + 1  # Start from next column
+                    self._remove_queen()
+
+    def _frames(self, steps):
+        """
+        Collapse the steps of a failed subtree into a single backtrack frame.
+
+        Once the search backtracks, its steps are not drawn until the next
+        queen is placed (in the row the search went back to): that placement is
+        yielded as a backtrack frame for its row instead.
+        """
+        backtracking = False
+        for step in steps:
+            if step[0] == BACKTRACK:
+                backtracking = True
+            elif step[0] == PLACE and backtracking:
+                backtracking = False
+                yield (BACKTRACK,) + step[1:]
+            elif not backtracking:
+                yield step
+
+    def _skip_frames(self):
+        """
+        Run the search, and yield every k-th of its frames (see `_frames`).
+
+        The length of the search is not known in advance: after every frame
+        drawn, k is set as if the frames left had to cover as many steps as the
+        search took so far. The frames left are the time left until `duration`
+        divided by the time a frame took so far (drawing it and searching
+        until the next one), but never fewer than `min_frames`, so the steps
+        drawn get sparser as the search goes on without the playback ever
+        collapsing to a few frames. The search runs at full speed between the
+        frames drawn.
+        """
+        start = time.perf_counter()
+        drawn = 0
+        next_frame = 1
+        for count, frame in enumerate(self._frames(self._search()), 1):
+            if count < next_frame:
+                # Keep the window responsive between the frames
+                if count % 4096 == 0:
+                    self._check_events()
+                continue
+            yield frame
+            drawn += 1
+            elapsed = time.perf_counter() - start
+            # The time a frame takes: drawing it and searching until the next
+            frame_time = elapsed / drawn
+            frames_left = max(self.min_frames, (self.duration - elapsed) / frame_time)
+            self.steps_per_frame = max(1, math.ceil(count / frames_left))
+            next_frame = count + self.steps_per_frame
+
+    def _draw_step(self, step):
+        """
+        Draw the chessboard and the queens after a step of the search.
+        """
+        self._draw_chessboard_and_queens()
+        if step[0] == PROBE:
             # Animation the search for a position
-            self._draw_chessboard_and_queens()
+            row, col, conflicting_queen = step[1:]
             self._update_queen_position(row, col)
+            self.current_queen.blitme(self.screen)
             if conflicting_queen:
                 self._highlight_conflict(
                     row, col, conflicting_queen.row, conflicting_queen.col
                 )
-                pygame.display.flip()
-                clock.tick(1.5 * self.speed)
-            else:
-                pygame.display.flip()
-                clock.tick(1.5 * self.speed)
-                return col
-        return -1
+        elif step[0] == PLACE:
+            # Highlight the next row with yellow
+            self._highlight_current_row(step[1] + 1, backtrack=False)
+        else:
+            # Highlight the row with red
+            self._highlight_current_row(step[1], backtrack=True)
 
     def _listen_to_user(self):
         """
@@ -217,43 +407,26 @@ class QueenPuzzle:
         self._draw_chessboard_and_queens()
         # Update the screen
         pygame.display.flip()
-        current_row = 0
-        start = 0  # the column from which we start
-        while current_row >= 0 and current_row < self.nQueens:
-            # Find a position for the current queen
-            col = self._find_position(current_row, start, clock)
+
+        if self.duration is None:
+            steps = self._search()
+        else:
+            steps = self._skip_frames()
+        for step in steps:
             # Check for events, e.g. if user wants to quit the animation
             self._check_events()
-            # If a position is found
-            if col != -1:
-                backtrack_flag = False  # Moving forward
-                self._place_queen(current_row, col)  # Place the queen
-                self._draw_chessboard_and_queens()  # Draw stuff
-                self._highlight_current_row(
-                    current_row + 1, backtrack_flag
-                )  # Highlight with yellow
-                current_row += 1  # Move to next row
-                start = 0  # Start from the first column
-            else:
-                backtrack_flag = True
-                current_row -= 1
-                # If the puzzle cannot be solved, current_row becomes negative
-                if current_row >= 0:
-                    self._draw_chessboard_and_queens()
-                    self._highlight_current_row(current_row, backtrack_flag)
-                    start = self.queens_list[-1].col + 1  # Start from next column
-                    self._remove_queen()
-
-            # If all queens have been placed, listen to the user if he wants to quit
-            if current_row == self.nQueens:
-                self._listen_to_user()
+            self._draw_step(step)
+            pygame.display.flip()
+            # The search for a position is animated faster
+            clock.tick(1.5 * self.speed if step[0] == PROBE else self.speed)
 
-            # If all cannot be placed, draw the board and listen to the user
-            if current_row < 0:
-                self._fail_to_solve()
+        # If all queens have been placed, listen to the user if he wants to quit
+        if len(self.queens_list) == self.nQueens:
+            self._draw_chessboard_and_queens()
+            self._listen_to_user()
 
-            pygame.display.flip()
-            clock.tick(self.speed)
+        # If all cannot be placed, draw the board and listen to the user
+        self._fail_to_solve()
 
 
 class Queen(pygame.sprite.Sprite):
@@ -263,10 +436,10 @@ class Queen(pygame.sprite.Sprite):
 
     def __init__(self, width=0, height=0):
         super().__init__()
-        self.image = pygame.image.load("resources/queen.png")
-        # Adjust the queen dimensions to be the same as the square dimensions
-        if width != 0 and height != 0:
-            self.image = pygame.transform.scale(self.image, (width, height))
+        # Adjust the queen dimensions to be the same as the square dimensions.
+        # The image is loaded and scaled once, then shared by all queens.
+        size = (width, height) if width != 0 and height != 0 else None
+        self.image = assets.surface("queen.png", size)
         self.rect = self.image.get_rect()
         self.centerx = 0
         self.centery = 0
@@ -293,5 +466,8 @@ if __name__ == "__main__":
     nQueens = 8  # Number of queens
     speed = 3  # Animation speed
     screen_size = 800  # Screen size
-    puzzle = QueenPuzzle(nQueens, screen_size, screen_size, speed)
+    # Beyond 12 queens, drawing every step of the search takes hours: only draw
+    # enough of them for the animation to last about a minute
+    duration = 60 if nQueens > 12 else None
+    puzzle = QueenPuzzle(nQueens, screen_size, screen_size, speed, duration)
     puzzle.solve()
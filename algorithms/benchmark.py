@@ -0,0 +1,348 @@
+"""
+Benchmark the sorting algorithms of `sorting.py` without a display.
+
+Every algorithm sorts seeded inputs of several kinds (random, sorted, reverse
+sorted, ...) and sizes. For every run, the wall time and the number of
+operations (comparisons, swaps, writes) are recorded and printed as a table.
+
+The results can be saved as a baseline and later compared with a new run: a
+change in the number of operations, a run that is much slower than in the
+baseline or that no longer ends with the "ok" status is reported as a
+regression (and a run that now ends with "ok" as an improvement). For example
+
+    python3 algorithms/benchmark.py --sizes 10 100 1000 --save baseline.json
+    python3 algorithms/benchmark.py --sizes 10 100 1000 --compare baseline.json
+
+NOTE the quadratic sorts (bubble and insertion sort) are only run up to
+`max_quadratic_size` elements, so the worst cases do not take hours. A run is
+also stopped after `max_events` events ("too slow"), or as soon as its
+recursion is deeper than `max_depth` ("recursion"): every event of a recursive
+sort is passed up its whole chain of `yield from`, so a degenerate recursion
+(e.g. quicksort on sorted input) gets slower with every level, long before it
+reaches the recursion limit of Python. Both limits count events, so a run gets
+the same status on every machine. A run still going after `max_seconds`
+seconds is stopped as well ("timeout"), but since that depends on the speed of
+the machine, it is never compared with the baseline.
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import Counter
+from itertools import islice
+from operator import itemgetter
+
+import sorting
+from instrumentation import generator_depth
+
+
+def _whole(sort):
+    # Adapt the sorts taking the bounds of the subarray to sort
+    return lambda array: sort(array, 0, len(array) - 1)
+
+
+ALGORITHMS = {
+    "bubble": sorting.bubble_sort,
+    "comb": sorting.comb_sort,
+    "insertion": sorting.insertion_sort,
+    "binary_insertion": sorting.binary_insertion_sort,
+    "shell": sorting.shell_sort,
+    "shell_tokuda": lambda array: sorting.shell_sort(array, gaps="tokuda"),
+    "quicksort": _whole(sorting.quicksort),
+    "introsort": _whole(sorting.introsort),
+    "three_way": _whole(sorting.quicksort_three_way),
+    "hoare": _whole(sorting.quicksort_hoare),
+    "heapsort": _whole(sorting.heapsort),
+    "merge": sorting.merge_sort,
+    "counting": sorting.counting_sort,
+    "radix": sorting.radix_sort,
+}
+
+# Sorts taking O(n^2) time on most inputs
+QUADRATIC = {"bubble", "insertion", "binary_insertion"}
+
+
+def random_input(n, rng):
+    return [rng.randrange(n) for _ in range(n)]
+
+
+def sorted_input(n, rng):
+    return sorted(random_input(n, rng))
+
+
+def reverse_input(n, rng):
+    return sorted(random_input(n, rng), reverse=True)
+
+
+def nearly_sorted_input(n, rng):
+    """
+    A sorted array in which 1% of the elements (at least one pair) are swapped.
+    """
+    array = sorted_input(n, rng)
+    for _ in range(max(1, n // 200)):
+        i, j = rng.randrange(n), rng.randrange(n)
+        array[i], array[j] = array[j], array[i]
+    return array
+
+
+def few_unique_input(n, rng):
+    """
+    Random elements with only 10 distinct values.
+    """
+    return [rng.randrange(10) for _ in range(n)]
+
+
+def organ_pipe_input(n, rng):
+    """
+    Increasing up to the middle of the array, then decreasing.
+    """
+    half = (n + 1) // 2
+    return list(range(half)) + list(range(n - half - 1, -1, -1))
+
+
+INPUTS = {
+    "random": random_input,
+    "sorted": sorted_input,
+    "reverse": reverse_input,
+    "nearly_sorted": nearly_sorted_input,
+    "few_unique": few_unique_input,
+    "organ_pipe": organ_pipe_input,
+}
+
+# Default settings
+sizes = [10, 100, 1000, 10**4, 10**5, 10**6]
+seed = 0
+max_quadratic_size = 10**4
+max_events = 5 * 10**7
+max_seconds = 60
+# Much deeper than the recursion of the O(n log n) sorts on 10^6 elements
+max_depth = 100
+# Number of events between two checks of the limits above
+check_interval = 4096
+# A run is slower than in the baseline if it takes `tolerance` times as long.
+# Runs shorter than `min_seconds` are too noisy to be compared.
+tolerance = 1.5
+min_seconds = 0.1
+
+
+def run(
+    algorithm,
+    array,
+    max_events=max_events,
+    max_seconds=max_seconds,
+    max_depth=max_depth,
+):
+    """
+    Sort a copy of `array` with `algorithm` (a key of `ALGORITHMS`).
+
+    Return the result as a dict: the wall time, the number of events by
+    operation name and the status of the run ("ok", "too slow" if it was
+    stopped after `max_events` events, "recursion" if it went deeper than
+    `max_depth` or the recursion limit, "timeout" if it was stopped after
+    `max_seconds` seconds, or "wrong" if the array is not sorted).
+    """
+    copy = array[:]
+    steps = ALGORITHMS[algorithm](copy)
+    max_depth = min(max_depth, sys.getrecursionlimit() // 2)
+    counts = Counter()
+    status = "ok"
+
+    start = time.perf_counter()
+    try:
+        events = 0
+        while True:
+            # Counting in C keeps the overhead over `sorting.run` small
+            size = min(check_interval, max_events - events)
+            counts.update(map(itemgetter(0), islice(steps, size)))
+            total = sum(counts.values())
+            if total - events < size:
+                break
+            events = total
+            if events >= max_events:
+                if next(steps, None) is not None:
+                    status = "too slow"
+                break
+            if generator_depth(steps) > max_depth:
+                status = "recursion"
+                break
+            if time.perf_counter() - start > max_seconds:
+                status = "timeout"
+                break
+    except RecursionError:
+        status = "recursion"
+    seconds = time.perf_counter() - start
+
+    if status == "ok" and copy != sorted(array):
+        status = "wrong"
+
+    return {
+        "seconds": seconds,
+        "counts": {name: counts[op] for op, name in sorting.OP_NAMES.items()},
+        "status": status,
+    }
+
+
+def benchmark(
+    algorithms=ALGORITHMS,
+    inputs=INPUTS,
+    sizes=sizes,
+    seed=seed,
+    max_quadratic_size=max_quadratic_size,
+    max_events=max_events,
+    max_seconds=max_seconds,
+    max_depth=max_depth,
+):
+    """
+    Run every algorithm on every kind of input (a dict of input generators,
+    like `INPUTS`) of every size.
+
+    Every (input, size) pair is generated from its own seeded random generator,
+    so all the algorithms sort the same arrays, in every run. Yield one result
+    per run (see `run`), with its algorithm, input and size.
+    """
+    for size in sizes:
+        for family, generate in inputs.items():
+            rng = random.Random(f"{seed}-{family}-{size}")
+            array = generate(size, rng)
+            for algorithm in algorithms:
+                if algorithm in QUADRATIC and size > max_quadratic_size:
+                    continue
+                result = run(algorithm, array, max_events, max_seconds, max_depth)
+                yield {"algorithm": algorithm, "input": family, "size": size, **result}
+
+
+def format_row(result):
+    counts = result["counts"]
+    return (
+        f"{result['algorithm']:<17}{result['input']:<14}{result['size']:>9}"
+        f"{result['seconds']:>11.4f}{counts['compare']:>13}{counts['swap']:>13}"
+        f"{counts['write'] + counts['shift'] + counts['buffer']:>13}"
+        f"  {result['status']}"
+    )
+
+
+HEADER = (
+    f"{'algorithm':<17}{'input':<14}{'n':>9}{'time (s)':>11}"
+    f"{'comparisons':>13}{'swaps':>13}{'writes':>13}  status"
+)
+
+
+def compare(results, baseline, tolerance=tolerance, min_seconds=min_seconds):
+    """
+    Compare `results` with the results of a `baseline` run.
+
+    Return two lists of messages: the regressions and the improvements. A run
+    that does not have the same number of operations as in the baseline, that
+    is more than `tolerance` times slower, or that no longer ends with the "ok"
+    status is a regression. A run that now ends with "ok" is an improvement.
+    The runs stopped early are only compared by status, and the runs stopped
+    after `max_seconds` ("timeout") are not compared at all, since both depend
+    on the speed of the machine.
+    """
+    previous = {
+        (result["algorithm"], result["input"], result["size"]): result
+        for result in baseline["results"]
+    }
+    regressions = []
+    improvements = []
+    for result in results:
+        key = (result["algorithm"], result["input"], result["size"])
+        if key not in previous:
+            continue
+        old = previous[key]
+        name = "{} on {} input of size {}".format(*key)
+
+        if "timeout" in (result["status"], old["status"]):
+            continue
+        elif result["status"] != old["status"]:
+            message = f"{name}: {old['status']} -> {result['status']}"
+            if result["status"] == "ok":
+                improvements.append(message)
+            else:
+                regressions.append(message)
+        elif result["status"] in ("too slow", "recursion"):
+            continue
+        elif result["counts"] != old["counts"]:
+            changes = ", ".join(
+                f"{op} {old['counts'].get(op, 0)} -> {count}"
+                for op, count in result["counts"].items()
+                if count != old["counts"].get(op, 0)
+            )
+            regressions.append(f"{name}: {changes}")
+        elif (
+            max(result["seconds"], old["seconds"]) >= min_seconds
+            and result["seconds"] > tolerance * old["seconds"]
+        ):
+            regressions.append(
+                f"{name}: {old['seconds']:.4f}s -> {result['seconds']:.4f}s"
+            )
+    return regressions, improvements
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the sorting algorithms of `sorting.py`."
+    )
+    parser.add_argument(
+        "--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS)
+    )
+    parser.add_argument("--inputs", nargs="+", choices=INPUTS, default=list(INPUTS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=sizes)
+    parser.add_argument("--seed", type=int, default=seed)
+    parser.add_argument("--max-quadratic-size", type=int, default=max_quadratic_size)
+    parser.add_argument("--max-events", type=int, default=max_events)
+    parser.add_argument("--max-seconds", type=float, default=max_seconds)
+    parser.add_argument("--max-depth", type=int, default=max_depth)
+    parser.add_argument("--save", metavar="FILE", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare with a baseline")
+    parser.add_argument("--tolerance", type=float, default=tolerance)
+    args = parser.parse_args()
+
+    print(HEADER)
+    results = []
+    for result in benchmark(
+        args.algorithms,
+        {family: INPUTS[family] for family in args.inputs},
+        args.sizes,
+        args.seed,
+        args.max_quadratic_size,
+        args.max_events,
+        args.max_seconds,
+        args.max_depth,
+    ):
+        print(format_row(result), flush=True)
+        results.append(result)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"seed": args.seed, "results": results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline["seed"] != args.seed:
+            sys.exit(f"The baseline was run with seed {baseline['seed']}")
+
+        regressions, improvements = compare(results, baseline, args.tolerance)
+        print()
+        if improvements:
+            print(f"{len(improvements)} improvement(s):")
+            for message in improvements:
+                print(f"  {message}")
+        if regressions:
+            print(f"{len(regressions)} regression(s):")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print("No regression")
+
+
+if __name__ == "__main__":
+
+    main()
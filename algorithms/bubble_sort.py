@@ -7,20 +7,24 @@ __license__ = "MIT"
 __email__ = "ahmedhassan@aims.ac.za"
 
 import random
-import sys
-import time
 
 import pygame
-from utils import draw_array, animate_swap
-
-pygame.init()
+import sorting
+from utils import (
+    Scheduler,
+    draw_array,
+    animate_swap,
+    glyphs,
+    counter,
+    run_sort,
+    open_window,
+)
 
 screen_width, screen_height = 1200, 500
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Bubble Sort Animation")
+screen = None
 
 # Font
-font = pygame.font.Font(None, 36)
+font = None
 
 
 BLACK = (0, 0, 0)
@@ -44,8 +48,10 @@ array = [random.randint(1, 99) for _ in range(num_elements)]
 # Uncomment the line below
 # array = sorted(array, reverse=True)
 
-rect_width = screen_width // num_elements
+rect_width = max(1, screen_width // num_elements)
 rect_height = 100
+# Beyond this number of elements, the array is drawn as bars (see `draw_bars`)
+max_labelled_elements = screen_width // 20
 # Place the array in the middle of the screen
 y = (screen_height - rect_height) // 2
 
@@ -53,18 +59,61 @@ y = (screen_height - rect_height) // 2
 clock = pygame.time.Clock()
 speed = 360  # frame rate
 delay = 0.2  # seconds
+swap_duration = 0.3  # seconds per swap
+# Runs the animation and keeps the window responsive during the delays
+scheduler = Scheduler(clock)
 
+# Set to a ".json" or ".csv" file to save the operation counts and the render
+# timings at the end of the run (press S to show them over the animation)
+stats_file = None
 
-def bubble_sort(array):
-    n = len(array)
-    while n >= 1:
-        k = 0
-        for i in range(1, n):
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+# The bubble sort variant to animate:
+#   "bubble": compare and swap adjacent elements
+#   "comb": compare and swap elements `gap` positions apart, shrinking the gap
+#   by 1.3 after every pass until it becomes a plain bubble sort
+variant = "bubble"
+VARIANTS = {"bubble": sorting.bubble_sort, "comb": sorting.comb_sort}
 
+
+def bubble_sort(array):
+    """
+    Animate bubble sort by replaying the events of the selected `variant`
+    (e.g. `sorting.bubble_sort`).
+
+    The algorithm sorts its own copy of `array`; `animate_swap` keeps `array`
+    (the displayed one) in sync. Yield the delays between the steps, so the
+    animation is meant to be run by `scheduler`.
+    """
+    for event in counter.count(VARIANTS[variant](array[:])):
+        if event.op == sorting.COMPARE:
+            draw_array(
+                array,
+                screen,
+                y,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_indexes=[event.i, event.j],
+                # Connect the elements if they are not next to each other (comb sort)
+                connect_indexes=[event.i, event.j] if event.j - event.i > 1 else None,
+            )
+            yield delay
+        elif event.op == sorting.SWAP:
+            animate_swap(
+                array,
+                event.i,
+                event.j,
+                y,
+                screen,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                duration=scheduler.scale(swap_duration),
+            )
             draw_array(
                 array,
                 screen,
@@ -74,37 +123,10 @@ def bubble_sort(array):
                 clock,
                 speed,
                 font,
-                highlight_indexes=[i - 1, i],
+                highlight_indexes=[event.i, event.j],
+                highlight_color=GREEN,
             )
-            time.sleep(delay)
-            if array[i - 1] > array[i]:
-                animate_swap(
-                    array,
-                    i - 1,
-                    i,
-                    y,
-                    screen,
-                    rect_width,
-                    rect_height,
-                    clock,
-                    speed,
-                    font,
-                )
-                draw_array(
-                    array,
-                    screen,
-                    y,
-                    rect_width,
-                    rect_height,
-                    clock,
-                    speed,
-                    font,
-                    highlight_indexes=[i - 1, i],
-                    highlight_color=GREEN,
-                )
-                time.sleep(delay)
-                k = i
-        n = k
+            yield delay
     draw_array(
         array,
         screen,
@@ -114,21 +136,35 @@ def bubble_sort(array):
         clock,
         speed,
         font,
-        list(range(len(array))),
+        range(len(array)),
         highlight_color=GREEN,
     )
 
 
-def main():
-    running = True
-    bubble_sort(array)
+def setup():
+    """
+    Open the window and create the fonts.
+    """
+    global screen, font
 
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+    screen = open_window("Bubble Sort Animation", (screen_width, screen_height))
+    font = glyphs.font(36)
 
-    pygame.quit()
+
+def main():
+    setup()
+
+    run_sort(
+        bubble_sort(array),
+        VARIANTS[variant],
+        array,
+        screen,
+        clock,
+        speed,
+        scheduler,
+        labelled=num_elements <= max_labelled_elements,
+        stats_file=stats_file,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+"""
+Animated counting sort and radix sort.
+
+NOTE both algorithms only sort integers, but in O(n + k) time, where k is the
+number of buckets, instead of the O(n log(n)) of comparison sorts.
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import random
+
+import pygame
+import sorting
+from utils import Scheduler, draw_array, glyphs, counter, run_sort, open_window
+
+screen_width, screen_height = 1200, 600
+screen = None
+
+# Font
+font = None
+# Smaller font for the buckets, which may be narrow
+bucket_font = None
+
+
+BLACK = (0, 0, 0)
+BLUE = (58, 148, 255)
+LIGHT_BLUE = (170, 214, 255)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GOLDEN_YELLOW = (255, 215, 0)
+GREEN = (50, 205, 50)
+
+
+# Input array
+num_elements = 10
+array = [random.randint(1, 99) for _ in range(num_elements)]
+
+rect_width = max(1, screen_width // num_elements)
+rect_height = 100
+# Beyond this number of elements, the array is drawn as bars (see `draw_bars`)
+max_labelled_elements = screen_width // 20
+# The array in the upper half of the screen and the buckets below it
+y = (screen_height - 3 * rect_height) // 2
+y_buckets = y + 2 * rect_height
+
+# Control animation speed
+clock = pygame.time.Clock()
+speed = 360  # frame rate
+delay = 0.3  # seconds
+# Runs the animation and keeps the window responsive during the delays
+scheduler = Scheduler(clock)
+
+# Set to a ".json" or ".csv" file to save the operation counts and the render
+# timings at the end of the run (press S to show them over the animation)
+stats_file = None
+
+# The algorithm to animate:
+#   "counting": one bucket per value between the smallest and largest element
+#   "radix": one bucket per decimal digit, sorting by the last digit first
+variant = "radix"
+VARIANTS = {"counting": sorting.counting_sort, "radix": sorting.radix_sort}
+
+
+def draw(
+    array,
+    counts,
+    highlight_indexes=None,
+    highlight_color=GOLDEN_YELLOW,
+    bucket_index=None,
+):
+    """
+    Draw the array and, as a second row below it, the number of elements in
+    every bucket. Empty buckets are not drawn.
+    """
+    draw_array(
+        array,
+        screen,
+        y,
+        rect_width,
+        rect_height,
+        clock,
+        speed,
+        font,
+        highlight_indexes=highlight_indexes,
+        highlight_color=highlight_color,
+        flip=False,
+    )
+    draw_array(
+        [count or None for count in counts],
+        screen,
+        y_buckets,
+        max(1, screen_width // len(counts)),
+        rect_height,
+        clock,
+        speed,
+        bucket_font,
+        highlight_indexes=[bucket_index] if bucket_index is not None else None,
+        highlight_color=LIGHT_BLUE,
+        erase=False,
+    )
+
+
+def counting_sort(array):
+    """
+    Animate counting sort or radix sort (see `variant`) by replaying the
+    events of `sorting.counting_sort` or `sorting.radix_sort`.
+
+    The algorithm sorts its own copy of `array`; the events keep `array` (the
+    displayed one) and the bucket counts in sync. Yield the delays between the
+    steps, so the animation is meant to be run by `scheduler`.
+    """
+    if not array:
+        return
+
+    if variant == "radix":
+        num_buckets = 10
+    else:
+        num_buckets = max(array) - min(array) + 1
+    counts = [0] * num_buckets
+    # The bucket being written back to the array
+    bucket = None
+
+    for event in counter.count(VARIANTS[variant](array[:])):
+        if event.op == sorting.BUCKET:
+            # The first element of a new pass: all the buckets are empty
+            if event.i == 0:
+                counts = [0] * num_buckets
+            counts[event.value] += 1
+            draw(array, counts, highlight_indexes=[event.i], bucket_index=event.value)
+            yield delay
+        elif event.op == sorting.PARTITION:
+            # The elements of the bucket go to array[i..j]
+            bucket = event.value
+            draw(
+                array,
+                counts,
+                highlight_indexes=range(event.i, event.j + 1),
+                highlight_color=RED,
+                bucket_index=bucket,
+            )
+            yield delay
+        elif event.op == sorting.WRITE:
+            sorting.apply_event(array, event)
+            counts[bucket] -= 1
+            draw(
+                array,
+                counts,
+                highlight_indexes=[event.i],
+                highlight_color=GREEN,
+                bucket_index=bucket,
+            )
+            yield 0.5 * delay
+
+    draw(array, counts, highlight_indexes=range(len(array)), highlight_color=GREEN)
+
+
+def setup():
+    """
+    Open the window and create the fonts.
+    """
+    global screen, font, bucket_font
+
+    screen = open_window(
+        "Counting Sort and Radix Sort Animation", (screen_width, screen_height)
+    )
+    font = glyphs.font(36)
+    bucket_font = glyphs.font(24)
+
+
+def main():
+    setup()
+
+    run_sort(
+        counting_sort(array),
+        VARIANTS[variant],
+        array,
+        screen,
+        clock,
+        speed,
+        scheduler,
+        labelled=num_elements <= max_labelled_elements,
+        stats_file=stats_file,
+    )
+
+
+if __name__ == "__main__":
+
+    main()
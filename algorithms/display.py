@@ -0,0 +1,142 @@
+"""
+Display helpers shared by the algorithms and the data structures.
+
+NOTE algorithms/ and data_structures/ are separate script roots, each with its
+own `utils` module. The scripts of data_structures/ import this module from
+here (see `data_structures/utils.py`), so both use the same implementation.
+It only depends on pygame: the sort instrumentation stays in `utils.py`.
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import math
+import sys
+import time
+from collections import OrderedDict
+
+import pygame
+
+
+class GlyphCache:
+    """
+    Cache rendered text surfaces so steady-state frames do no font rasterization.
+
+    Surfaces are keyed by the text, the font (i.e. typeface and size) and the
+    color. The least recently used surface is evicted once `maxsize` is reached.
+    Fonts are also cached by size, so every renderer asking for the same size
+    shares the same `pygame.font.Font` (and therefore the same cached glyphs).
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._fonts = {}
+        self._surfaces = OrderedDict()
+
+    def font(self, size):
+        """
+        Return the default pygame font of `size`, creating it only once.
+        """
+        if size not in self._fonts:
+            self._fonts[size] = pygame.font.Font(None, size)
+        return self._fonts[size]
+
+    def render(self, text, color, font):
+        """
+        Equivalent to `font.render(text, True, color)`, but cached.
+        """
+        key = (text, font, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.maxsize:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self._fonts.clear()
+        self._surfaces.clear()
+
+
+# Shared by all renderers
+glyphs = GlyphCache()
+
+class Scheduler:
+    """
+    Run an animation from a frame loop instead of pausing with `time.sleep`.
+
+    The animation is a generator that draws a step and then yields the number
+    of seconds to wait before its next step. While waiting, the scheduler keeps
+    processing events, so the window never freezes.
+
+    `speed` scales every delay uniformly: 2 plays the animation twice as fast
+    and `math.inf` plays it as fast as possible. While running, press UP/DOWN
+    to double/halve the speed, F to toggle "as fast as possible" and Q to quit.
+    More keys can be bound to functions (without arguments) in `key_bindings`.
+    """
+
+    def __init__(self, clock=None, fps=60, speed=1.0, key_bindings=None):
+        self.clock = clock or pygame.time.Clock()
+        self.fps = fps
+        self.speed = speed
+        self.key_bindings = key_bindings or {}
+        # The speed to go back to when leaving "as fast as possible"
+        self._normal_speed = speed if speed != math.inf else 1.0
+
+    def scale(self, seconds):
+        """
+        Return `seconds` adjusted by the current speed.
+        """
+        return seconds / self.speed
+
+    def check_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (
+                event.type == pygame.KEYDOWN and event.key == pygame.K_q
+            ):
+                pygame.quit()
+                sys.exit()
+
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_UP:
+                self.speed *= 2
+            elif event.key == pygame.K_DOWN:
+                self.speed /= 2
+            elif event.key == pygame.K_f:
+                if self.speed == math.inf:
+                    self.speed = self._normal_speed
+                else:
+                    self._normal_speed = self.speed
+                    self.speed = math.inf
+            elif event.key in self.key_bindings:
+                self.key_bindings[event.key]()
+
+    def run(self, animation):
+        """
+        Run `animation` until it is exhausted.
+        """
+        resume_at = 0.0
+        while True:
+            self.check_events()
+
+            now = time.perf_counter()
+            if now < resume_at:
+                self.clock.tick(self.fps)
+                continue
+
+            try:
+                delay = next(animation)
+            except StopIteration:
+                return
+            resume_at = now + self.scale(delay or 0)
+
+    def wait(self, seconds):
+        """
+        Wait `seconds` (adjusted by the speed) while processing events.
+        """
+        self.run(iter((seconds,)))
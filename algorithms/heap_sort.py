@@ -0,0 +1,248 @@
+"""
+Animated heap sort.
+
+NOTE heap sort sorts in place in O(n log(n)) time, even in the worst case. The
+heap is not a separate data structure: it is stored in the array itself, where
+the children of the element at index k are at indexes 2k + 1 and 2k + 2. The
+animation draws this implicit heap as a binary tree above the array.
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import random
+
+import pygame
+import sorting
+from utils import (
+    Scheduler,
+    draw_array,
+    animate_swap,
+    glyphs,
+    counter,
+    run_sort,
+    open_window,
+)
+
+screen_width, screen_height = 1200, 700
+screen = None
+
+# Font
+font = None
+
+
+BLACK = (0, 0, 0)
+BLUE = (58, 148, 255)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GOLDEN_YELLOW = (255, 215, 0)
+GREEN = (50, 205, 50)
+
+
+# Input array
+num_elements = 15
+array = [random.randint(1, 99) for _ in range(num_elements)]
+
+# Worst case for quicksort, not for heap sort: uncomment the line below
+# array = sorted(array, reverse=True)
+
+rect_width = max(1, screen_width // num_elements)
+rect_height = 100
+# Beyond this number of elements, the array is drawn as bars (see `draw_bars`)
+max_labelled_elements = screen_width // 20
+# The array at the bottom of the screen
+y = screen_height - rect_height - 50
+
+# The tree (same look as the trees in `data_structures/animation.py`)
+node_radius = 25
+node_color = RED
+edge_color = WHITE
+edge_width = 3
+# The first level of the tree and the vertical space between the levels
+y_root = 60
+level_height = 100
+# Beyond this number of elements, the nodes of the last level overlap and only
+# the array is drawn
+max_tree_elements = 31
+
+# Control animation speed
+clock = pygame.time.Clock()
+speed = 360  # frame rate
+delay = 0.4  # seconds
+swap_duration = 0.6  # seconds per swap
+# Runs the animation and keeps the window responsive during the delays
+scheduler = Scheduler(clock)
+
+# Set to a ".json" or ".csv" file to save the operation counts and the render
+# timings at the end of the run (press S to show them over the animation)
+stats_file = None
+
+
+def node_position(k):
+    """
+    Return the center of the node at index `k` of the heap. The levels of the
+    tree are spread evenly over the width of the screen.
+    """
+    level = (k + 1).bit_length() - 1
+    nodes_before = 2**level - 1
+    x = (k - nodes_before + 0.5) * screen_width / 2**level
+    return int(x), y_root + level * level_height
+
+
+def draw_heap(surface, array, heap_end, highlight_indexes=(), highlight_color=None):
+    """
+    Draw the heap array[0..heap_end] as a binary tree on `surface`: first the
+    edges, then the nodes on top of them.
+    """
+    for k in range(1, heap_end + 1):
+        x, y_node = node_position(k)
+        x_parent, y_parent = node_position((k - 1) // 2)
+        pygame.draw.line(
+            surface,
+            edge_color,
+            (x, y_node - node_radius),
+            (x_parent, y_parent + node_radius),
+            edge_width,
+        )
+
+    for k in range(heap_end + 1):
+        color = highlight_color if k in highlight_indexes else node_color
+        center = node_position(k)
+        pygame.draw.circle(surface, color, center, node_radius)
+        pygame.draw.circle(surface, edge_color, center, node_radius, 3)
+        text = glyphs.render(str(array[k]), WHITE, font)
+        surface.blit(text, text.get_rect(center=center))
+
+
+def draw(
+    array,
+    heap_end,
+    highlight_indexes=(),
+    highlight_color=GOLDEN_YELLOW,
+    connect_indexes=None,
+):
+    """
+    Draw the heap as a tree and the array below it. The elements after
+    `heap_end` are already sorted and drawn in green.
+    """
+    screen.fill(BLACK)
+    if len(array) <= max_tree_elements:
+        draw_heap(screen, array, heap_end, highlight_indexes, highlight_color)
+
+    # The heap and the sorted elements are drawn as two rows on the same line
+    draw_array(
+        array[: heap_end + 1],
+        screen,
+        y,
+        rect_width,
+        rect_height,
+        clock,
+        speed,
+        font,
+        highlight_indexes=highlight_indexes,
+        highlight_color=highlight_color,
+        connect_indexes=connect_indexes,
+        erase=False,
+        flip=False,
+    )
+    draw_array(
+        [None] * (heap_end + 1) + array[heap_end + 1 :],
+        screen,
+        y,
+        rect_width,
+        rect_height,
+        clock,
+        speed,
+        font,
+        highlight_indexes=range(heap_end + 1, len(array)),
+        highlight_color=GREEN,
+        erase=False,
+    )
+
+
+def heap_sort(array):
+    """
+    Animate heap sort by replaying the events of `sorting.heapsort`.
+
+    The algorithm sorts its own copy of `array`; `animate_swap` keeps `array`
+    (the displayed one) in sync. Yield the delays between the steps, so the
+    animation is meant to be run by `scheduler`.
+    """
+    # The heap is array[0..heap_end]
+    heap_end = len(array) - 1
+
+    for event in counter.count(sorting.heapsort(array[:], 0, len(array) - 1)):
+        if event.op == sorting.PARTITION:
+            # The largest element was moved to the end: the heap shrinks
+            heap_end = event.j
+            draw(array, heap_end)
+            yield delay
+
+        elif event.op == sorting.COMPARE:
+            draw(
+                array, heap_end, [event.i, event.j], connect_indexes=[event.i, event.j]
+            )
+            yield delay
+
+        elif event.op == sorting.SWAP:
+            # Moving the root (the largest element) to the end is drawn in
+            # blue, a swap while sifting down in red
+            color = BLUE if event.i == 0 and event.j == heap_end else RED
+            draw(array, heap_end, [event.i, event.j], color)
+            yield delay
+
+            # The tree stays still while the two elements of the array move
+            backdrop = pygame.Surface(screen.get_size())
+            backdrop.fill(BLACK)
+            if len(array) <= max_tree_elements:
+                draw_heap(backdrop, array, heap_end, [event.i, event.j], color)
+            animate_swap(
+                array,
+                event.i,
+                event.j,
+                y,
+                screen,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_color=color,
+                duration=scheduler.scale(swap_duration),
+                backdrop=backdrop,
+            )
+            draw(array, heap_end, [event.i, event.j], color)
+
+    draw(array, -1)
+
+
+def setup():
+    """
+    Open the window and create the fonts.
+    """
+    global screen, font
+
+    screen = open_window("Heap Sort Animation", (screen_width, screen_height))
+    font = glyphs.font(36)
+
+
+def main():
+    setup()
+
+    run_sort(
+        heap_sort(array),
+        lambda array: sorting.heapsort(array, 0, len(array) - 1),
+        array,
+        screen,
+        clock,
+        speed,
+        scheduler,
+        labelled=num_elements <= max_labelled_elements,
+        stats_file=stats_file,
+    )
+
+
+if __name__ == "__main__":
+
+    main()
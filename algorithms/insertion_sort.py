@@ -6,21 +6,27 @@ __author__ = "Ahmed Hassan"
 __license__ = "MIT"
 __email__ = "ahmedhassan@aims.ac.za"
 
+import functools
 import random
-import sys
-import time
 
 import pygame
-from utils import draw_array, animate_swap
-
-pygame.init()
+import sorting
+from utils import (
+    Scheduler,
+    draw_array,
+    animate_swap,
+    animate_shift,
+    glyphs,
+    counter,
+    run_sort,
+    open_window,
+)
 
 screen_width, screen_height = 1200, 400
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Insertion Sort Animation")
+screen = None
 
 # Font
-font = pygame.font.Font(None, 36)
+font = None
 
 BLACK = (0, 0, 0)
 BLUE = (58, 148, 255)
@@ -42,8 +48,10 @@ array = [random.randint(1, 99) for _ in range(num_elements)]
 # array = sorted(array, reverse=True)
 
 sorted_array = []
-rect_width = screen_width // num_elements
+rect_width = max(1, screen_width // num_elements)
 rect_height = 100
+# Beyond this number of elements, the array is drawn as bars (see `draw_bars`)
+max_labelled_elements = screen_width // 20
 
 y = (screen_height - rect_height) // 2
 
@@ -51,9 +59,39 @@ y = (screen_height - rect_height) // 2
 clock = pygame.time.Clock()
 speed = 720  # frame rate
 delay = 0.5  # seconds
+swap_duration = 0.3  # seconds per swap
+# Runs the animation and keeps the window responsive during the delays
+scheduler = Scheduler(clock)
+
+# Set to a ".json" or ".csv" file to save the operation counts and the render
+# timings at the end of the run (press S to show them over the animation)
+stats_file = None
+
+# The insertion sort variant to animate:
+#   "linear": scan the sorted subarray from right to left, swapping the
+#   element one position at a time
+#   "binary": find the position with a binary search and slide the larger
+#   elements to the right in a single move
+#   "shell": Shell sort, i.e. insertion sort over elements `gap` positions
+#   apart for decreasing gaps (Ciura's or Tokuda's sequence)
+variant = "linear"
+VARIANTS = {
+    "linear": sorting.insertion_sort,
+    "binary": sorting.binary_insertion_sort,
+    "shell": sorting.shell_sort,
+    "shell_tokuda": functools.partial(sorting.shell_sort, gaps="tokuda"),
+}
 
 
 def insertion_sort(array):
+    """
+    Animate insertion sort by replaying the events of the selected `variant`
+    (e.g. `sorting.insertion_sort`).
+
+    The algorithm sorts its own copy of `array`; `animate_swap` and
+    `animate_shift` keep `array` (the displayed one) in sync. Yield the delays
+    between the steps, so the animation is meant to be run by `scheduler`.
+    """
     draw_array(
         array,
         screen,
@@ -65,50 +103,42 @@ def insertion_sort(array):
         font,
         highlight_indexes=[0],
     )
-    time.sleep(delay)
-    for j in range(1, len(array)):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-        key = array[j]
-        draw_array(
-            array,
-            screen,
-            y,
-            rect_width,
-            rect_height,
-            clock,
-            speed,
-            font,
-            highlight_indexes=list(range(j)),
-            highlight_color=GREEN,
-        )
-        time.sleep(delay)
-
-        draw_array(
-            array,
-            screen,
-            y,
-            rect_width,
-            rect_height,
-            clock,
-            speed,
-            font,
-            highlight_indexes=[j],
-        )
-        time.sleep(delay)
-        i = j - 1
-        while i >= 0 and array[i] > key:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+    yield delay
+    for event in counter.count(VARIANTS[variant](array[:])):
+        if event.op == sorting.PARTITION:
+            # The sorted subarray array[0..j-1] and the element to insert array[j]
+            j = event.value
+            draw_array(
+                array,
+                screen,
+                y,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_indexes=range(j),
+                highlight_color=GREEN,
+            )
+            yield delay
+
+            draw_array(
+                array,
+                screen,
+                y,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_indexes=[j],
+            )
+            yield delay
+        elif event.op == sorting.SWAP:
             animate_swap(
                 array,
-                i,
-                i + 1,
+                event.i,
+                event.j,
                 y,
                 screen,
                 rect_width,
@@ -116,10 +146,39 @@ def insertion_sort(array):
                 clock,
                 speed,
                 font,
+                duration=scheduler.scale(swap_duration),
             )
-            time.sleep(0.5 * delay)
-            i -= 1
-        array[i + 1] = key
+            yield 0.5 * delay
+        elif event.op == sorting.SHIFT:
+            animate_shift(
+                array,
+                event.i,
+                event.j,
+                y,
+                screen,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                duration=scheduler.scale(swap_duration),
+            )
+            yield 0.5 * delay
+        elif event.op == sorting.COMPARE and variant != "linear":
+            # A probe of the binary search or a comparison `gap` positions apart
+            draw_array(
+                array,
+                screen,
+                y,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_indexes=[event.i, event.j],
+                connect_indexes=[event.i, event.j],
+            )
+            yield 0.5 * delay
 
     draw_array(
         array,
@@ -130,21 +189,35 @@ def insertion_sort(array):
         clock,
         speed,
         font,
-        highlight_indexes=list(range(len(array))),
+        highlight_indexes=range(len(array)),
         highlight_color=GREEN,
     )
 
 
-def main():
-    running = True
-    insertion_sort(array)
+def setup():
+    """
+    Open the window and create the fonts.
+    """
+    global screen, font
 
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+    screen = open_window("Insertion Sort Animation", (screen_width, screen_height))
+    font = glyphs.font(36)
+
+
+def main():
+    setup()
 
-    pygame.quit()
+    run_sort(
+        insertion_sort(array),
+        VARIANTS[variant],
+        array,
+        screen,
+        clock,
+        speed,
+        scheduler,
+        labelled=num_elements <= max_labelled_elements,
+        stats_file=stats_file,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,239 @@
+"""
+Count the operations of the sorting algorithms and time the drawing.
+
+`OpCounter` wraps the events of a sort (see `sorting.py`) and counts them by
+kind, along with the deepest recursion (or explicit stack) reached.
+`StageTimer` times named stages of the rendering (e.g. "draw_array" or "flip")
+frame by frame.
+`save_stats` writes both to a JSON or CSV file at the end of a run.
+
+NOTE this module does not depend on pygame, so the counters can be used by
+benchmarks as well.
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import csv
+import functools
+import json
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+from sorting import DEPTH, OP_NAMES
+
+
+def generator_depth(generator):
+    """
+    Return the number of generators in the `yield from` chain of `generator`
+    (1 if it is not delegating to another generator).
+
+    The sorts are written as generators that `yield from` their recursive
+    calls, so this is the current recursion depth of the sort.
+    """
+    depth = 0
+    while generator is not None:
+        depth += 1
+        generator = getattr(generator, "gi_yieldfrom", None)
+    return depth
+
+
+class OpCounter:
+    """
+    Count the events of a sort by kind (compare, swap, write, ...).
+
+    `max_depth` is the deepest the sort went: the depth of its explicit stack
+    for the iterative sorts, which report it with DEPTH events (e.g.
+    `introsort`), and the depth of its `yield from` chain otherwise, i.e. its
+    recursion depth (e.g. `quicksort`). The chain is only measured every
+    `depth_interval` events, since walking it costs as much as the recursion
+    is deep.
+    """
+
+    def __init__(self, depth_interval=256):
+        self.counts = Counter()
+        self.max_depth = 0
+        self.depth_interval = depth_interval
+
+    def count(self, steps):
+        """
+        Yield the events of `steps` (a sort generator), counting them on the way.
+        """
+        counts = self.counts
+        for k, event in enumerate(steps):
+            if event.op == DEPTH:
+                self.max_depth = max(self.max_depth, event.value)
+            else:
+                counts[event.op] += 1
+            if k % self.depth_interval == 0:
+                self.max_depth = max(self.max_depth, generator_depth(steps))
+            yield event
+
+    @property
+    def events(self):
+        return sum(self.counts.values())
+
+    def as_dict(self):
+        """
+        Return the counts by operation name, the total number of events and the
+        maximum depth.
+        """
+        stats = {name: self.counts[op] for op, name in OP_NAMES.items()}
+        stats["events"] = self.events
+        stats["max_depth"] = self.max_depth
+        return stats
+
+    def reset(self):
+        self.counts.clear()
+        self.max_depth = 0
+
+
+class StageTimer:
+    """
+    Time named stages of the rendering, frame by frame.
+
+    Stages may be nested: the time spent in a nested stage is not counted in
+    the stage around it, so the stages of a frame add up to the time spent
+    drawing it. `end_frame` closes the current frame (once the stages around
+    it are done). Only the last `max_frames` frames are kept, but the totals
+    cover the whole run.
+
+    A disabled timer does nothing, so the drawing functions can always be
+    timed.
+    """
+
+    def __init__(self, enabled=False, max_frames=100_000):
+        self.enabled = enabled
+        # The time spent in every stage ({stage: seconds}), one dict per frame
+        self.frames = deque(maxlen=max_frames)
+        self.num_frames = 0
+        self.totals = defaultdict(float)
+        self.maxima = defaultdict(float)
+        # Number of frames in which every stage ran
+        self.counts = Counter()
+        self._frame = defaultdict(float)
+        # [start time, time spent in nested stages] for every running stage
+        self._stack = []
+        self._end_frame = False
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time the body of a `with` statement as (part of) the stage `name`.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        entry = [time.perf_counter(), 0.0]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - entry[0]
+            if self._stack:
+                self._stack[-1][1] += elapsed
+            self._frame[name] += elapsed - entry[1]
+            if not self._stack and self._end_frame:
+                self.end_frame()
+
+    def timed(self, name):
+        """
+        Decorator timing every call of a function as the stage `name`.
+        """
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self.stage(name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def end_frame(self):
+        """
+        Close the current frame. Frames in which nothing was timed are ignored.
+        """
+        if self._stack:
+            # Wait for the stages of the frame that are still running
+            self._end_frame = True
+            return
+        self._end_frame = False
+        if not self._frame:
+            return
+        frame = dict(self._frame)
+        self._frame.clear()
+
+        self.frames.append(frame)
+        self.num_frames += 1
+        for name, seconds in frame.items():
+            self.totals[name] += seconds
+            self.counts[name] += 1
+            self.maxima[name] = max(self.maxima[name], seconds)
+
+    @property
+    def last_frame(self):
+        return self.frames[-1] if self.frames else {}
+
+    def summary(self):
+        """
+        Return, for every stage, the number of frames in which it ran and its
+        total, mean and maximum time per frame (in milliseconds).
+        """
+        return {
+            name: {
+                "frames": self.counts[name],
+                "total_ms": 1000 * total,
+                "mean_ms": 1000 * total / self.counts[name],
+                "max_ms": 1000 * self.maxima[name],
+            }
+            for name, total in self.totals.items()
+        }
+
+    def reset(self):
+        self.frames.clear()
+        self.num_frames = 0
+        self.totals.clear()
+        self.maxima.clear()
+        self.counts.clear()
+        self._frame.clear()
+        self._end_frame = False
+
+
+def save_stats(path, counter=None, timer=None):
+    """
+    Save the operation counts of `counter` and the render timings of `timer`
+    to `path`.
+
+    A ".json" file gets the counts, the summary of the timings and the timings
+    of every frame. Any other file is written as CSV with one `metric,value`
+    row per count and per summary value (e.g. `render.flip.mean_ms`).
+    """
+    operations = counter.as_dict() if counter is not None else {}
+    render = timer.summary() if timer is not None else {}
+
+    if str(path).endswith(".json"):
+        stats = {"operations": operations, "render": render}
+        if timer is not None:
+            stats["frames"] = list(timer.frames)
+        with open(path, "w") as file:
+            json.dump(stats, file, indent=2)
+        return
+
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["metric", "value"])
+        for name, value in operations.items():
+            writer.writerow([f"operations.{name}", value])
+        if timer is not None:
+            writer.writerow(["render.frames", timer.num_frames])
+        for stage, values in render.items():
+            for name, value in values.items():
+                writer.writerow([f"render.{stage}.{name}", value])
@@ -0,0 +1,179 @@
+"""
+Animated merge sort
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import random
+
+import pygame
+import sorting
+from utils import Scheduler, draw_array, glyphs, counter, run_sort, open_window
+
+screen_width, screen_height = 1200, 600
+screen = None
+
+# Font
+font = None
+
+
+BLACK = (0, 0, 0)
+BLUE = (58, 148, 255)
+LIGHT_BLUE = (170, 214, 255)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GOLDEN_YELLOW = (255, 215, 0)
+GREEN = (50, 205, 50)
+
+
+# Input array
+num_elements = 10
+array = [random.randint(1, 99) for _ in range(num_elements)]
+
+# Best Case: array is already sorted (a single run, no merge is needed)
+# Uncomment the line below
+# array = sorted(array)
+
+rect_width = max(1, screen_width // num_elements)
+rect_height = 100
+# Beyond this number of elements, the array is drawn as bars (see `draw_bars`)
+max_labelled_elements = screen_width // 20
+# The array in the upper half of the screen and the buffer below it
+y = (screen_height - 3 * rect_height) // 2
+y_buffer = y + 2 * rect_height
+
+# Control animation speed
+clock = pygame.time.Clock()
+speed = 360  # frame rate
+delay = 0.3  # seconds
+# Runs the animation and keeps the window responsive during the delays
+scheduler = Scheduler(clock)
+
+# Set to a ".json" or ".csv" file to save the operation counts and the render
+# timings at the end of the run (press S to show them over the animation)
+stats_file = None
+
+
+def draw(
+    array,
+    buffer,
+    highlight_indexes=None,
+    highlight_color=GOLDEN_YELLOW,
+    buffer_indexes=None,
+    connect_indexes=None,
+):
+    """
+    Draw the array and, as a second row below it, the auxiliary buffer.
+
+    `buffer_indexes` are the elements of the buffer to highlight in green.
+    """
+    draw_array(
+        array,
+        screen,
+        y,
+        rect_width,
+        rect_height,
+        clock,
+        speed,
+        font,
+        highlight_indexes=highlight_indexes,
+        highlight_color=highlight_color,
+        connect_indexes=connect_indexes,
+        flip=False,
+    )
+    draw_array(
+        buffer,
+        screen,
+        y_buffer,
+        rect_width,
+        rect_height,
+        clock,
+        speed,
+        font,
+        highlight_indexes=buffer_indexes,
+        highlight_color=GREEN,
+        erase=False,
+    )
+
+
+def merge_sort(array):
+    """
+    Animate merge sort by replaying the events of `sorting.merge_sort`.
+
+    The algorithm sorts its own copy of `array`; the events keep `array` (the
+    displayed one) and the displayed buffer in sync. Yield the delays between
+    the steps, so the animation is meant to be run by `scheduler`.
+    """
+    # Empty slots of the buffer are not drawn
+    buffer = [None] * len(array)
+
+    for event in counter.count(sorting.merge_sort(array[:])):
+        if event.op == sorting.PARTITION:
+            # The two runs array[i..value-1] and array[value..j] to merge
+            draw(
+                array,
+                buffer,
+                highlight_indexes=range(event.i, event.j + 1),
+                highlight_color=RED,
+            )
+            yield 2 * delay
+        elif event.op == sorting.COMPARE:
+            draw(
+                array,
+                buffer,
+                highlight_indexes=[event.i, event.j],
+                connect_indexes=[event.i, event.j],
+            )
+            yield delay
+        elif event.op == sorting.BUFFER:
+            # The smaller element goes to the next slot of the buffer
+            buffer[event.i] = array[event.j]
+            draw(
+                array,
+                buffer,
+                highlight_indexes=[event.j],
+                highlight_color=GREEN,
+                buffer_indexes=[event.i],
+            )
+            yield delay
+        elif event.op == sorting.WRITE:
+            # Copy the merged run back to the array
+            sorting.apply_event(array, event)
+            buffer[event.i] = None
+            draw(array, buffer, highlight_indexes=[event.i], highlight_color=GREEN)
+            yield 0.5 * delay
+
+    draw(array, buffer, highlight_indexes=range(len(array)), highlight_color=GREEN)
+
+
+def setup():
+    """
+    Open the window and create the fonts.
+    """
+    global screen, font
+
+    screen = open_window("Merge Sort Animation", (screen_width, screen_height))
+    font = glyphs.font(36)
+
+
+def main():
+    setup()
+
+    run_sort(
+        merge_sort(array),
+        sorting.merge_sort,
+        array,
+        screen,
+        clock,
+        speed,
+        scheduler,
+        labelled=num_elements <= max_labelled_elements,
+        stats_file=stats_file,
+    )
+
+
+if __name__ == "__main__":
+
+    main()
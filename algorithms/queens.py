@@ -0,0 +1,145 @@
+"""
+Count all the solutions of the N queens puzzle without a display.
+
+The search is the backtracking of `backtracking.py`, with the columns and the
+diagonals under attack kept as bitmasks, so finding the free squares of a row
+is a few integer operations. It is split by the column of the queen of the
+first row: every column is searched by its own task, in a pool of worker
+processes. For example
+
+    python3 algorithms/queens.py 12 --processes 4
+
+NOTE a solution mirrored left to right is another solution, whose first queen
+is in the mirrored column. So only the columns of the left half are searched
+and their solutions are counted twice (the middle column, for an odd N, is
+searched as well and counted once).
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import argparse
+import multiprocessing as mp
+import time
+from collections import defaultdict
+
+# Default settings
+n = 8
+processes = None  # one per CPU
+
+
+def count_solutions(n, first_column):
+    """
+    Count the solutions of the N queens puzzle with the queen of the first row
+    in `first_column`.
+
+    Return the number of solutions and the number of nodes visited (i.e. the
+    number of queens placed during the search, including the first one).
+
+    Bit c of the masks is column c of the current row: `columns` marks the
+    columns under attack, `left` and `right` the squares attacked along the
+    diagonals, which move by one column at every row.
+    """
+    full = (1 << n) - 1
+    solutions = 0
+    nodes = 0
+
+    def place(columns, left, right):
+        nonlocal solutions, nodes
+        nodes += 1
+        if columns == full:
+            solutions += 1
+            return
+        free = full & ~(columns | left | right)
+        while free:
+            bit = free & -free  # the right-most free square
+            free ^= bit
+            place(columns | bit, (left | bit) << 1 & full, (right | bit) >> 1)
+
+    bit = 1 << first_column
+    place(bit, bit << 1 & full, bit >> 1)
+    return solutions, nodes
+
+
+def _task(args):
+    n, column = args
+    start = time.perf_counter()
+    solutions, nodes = count_solutions(n, column)
+    return {
+        "column": column,
+        "solutions": solutions,
+        "nodes": nodes,
+        "seconds": time.perf_counter() - start,
+        "worker": mp.current_process().name,
+    }
+
+
+def count(n, processes=processes, symmetry=True):
+    """
+    Count all the solutions of the N queens puzzle, searching the columns of
+    the first row in parallel with `processes` worker processes.
+
+    Return the results of the columns searched (see `count_solutions`), by
+    column, with the time taken and the worker that searched it. If
+    `symmetry`, only the left half of the columns is searched (see above) and
+    `weight` is the number of solutions each of them stands for (2 or 1).
+    """
+    if symmetry:
+        columns = list(range((n + 1) // 2))
+    else:
+        columns = list(range(n))
+
+    with mp.Pool(processes) as pool:
+        results = pool.map(_task, [(n, column) for column in columns], chunksize=1)
+
+    for result in results:
+        mirrored = symmetry and result["column"] != n - 1 - result["column"]
+        result["weight"] = 2 if mirrored else 1
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Count all the solutions of the N queens puzzle."
+    )
+    parser.add_argument("n", nargs="?", type=int, default=n)
+    parser.add_argument("--processes", type=int, default=processes)
+    parser.add_argument(
+        "--no-symmetry",
+        dest="symmetry",
+        action="store_false",
+        help="search all the columns of the first row",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = count(args.n, args.processes, args.symmetry)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'column':>6}{'solutions':>14}{'nodes':>16}{'time (s)':>11}  worker")
+    for result in results:
+        print(
+            f"{result['column']:>6}{result['solutions']:>14}{result['nodes']:>16}"
+            f"{result['seconds']:>11.3f}  {result['worker']}"
+            + (" (x2)" if result["weight"] == 2 else "")
+        )
+
+    workers = defaultdict(lambda: [0, 0.0])
+    for result in results:
+        workers[result["worker"]][0] += 1
+        workers[result["worker"]][1] += result["seconds"]
+    print()
+    for worker, (tasks, seconds) in sorted(workers.items()):
+        print(f"{worker}: {tasks} column(s) in {seconds:.3f}s")
+
+    solutions = sum(result["weight"] * result["solutions"] for result in results)
+    nodes = sum(result["nodes"] for result in results)
+    print()
+    print(f"{args.n} queens: {solutions} solutions")
+    print(f"{nodes} nodes visited in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+
+    main()
@@ -9,27 +9,32 @@ __license__ = "MIT"
 __email__ = "ahmedhassan@aims.ac.za"
 
 import random
-import sys
-import time
 
 import pygame
-from utils import draw_array, animate_swap
-
-pygame.init()
+import sorting
+from utils import (
+    Scheduler,
+    draw_array,
+    animate_swap,
+    glyphs,
+    counter,
+    run_sort,
+    open_window,
+)
 
 screen_width, screen_height = 1200, 600
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Quicksort Animation")
+screen = None
 
 BLACK = (0, 0, 0)
 BLUE = (58, 148, 255)
+LIGHT_BLUE = (170, 214, 255)
 ORGANGE = (255, 151, 33)
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 GOLDEN_YELLOW = (255, 215, 0)
 GREEN = (50, 205, 50)
 
-font = pygame.font.Font(None, 36)
+font = None
 
 # Number of array elements
 num_elements = 10
@@ -41,8 +46,10 @@ num_elements = len(array)
 # Uncomment the line below to see the worst-case scenario (when the array is sorted in descending order)
 # array = sorted(array)
 
-rect_width = screen_width // num_elements
+rect_width = max(1, screen_width // num_elements)
 rect_height = 100
+# Beyond this number of elements, the array is drawn as bars (see `draw_bars`)
+max_labelled_elements = screen_width // 20
 # Place the array in the middle of the screen (roughly)
 y = screen_height // 2
 
@@ -51,175 +58,200 @@ y = screen_height // 2
 clock = pygame.time.Clock()
 speed = 720  # cap the frame rate
 delay = 0.5  # seconds
+swap_duration = 0.6  # seconds per swap
+# Runs the animation and keeps the window responsive during the delays
+scheduler = Scheduler(clock)
+
+# Set to a ".json" or ".csv" file to save the operation counts and the render
+# timings at the end of the run (press S to show them over the animation)
+stats_file = None
+
+# The quicksort variant to animate:
+#   "lomuto": recursive, the last element is the pivot (CLRS)
+#   "introsort": iterative with a median-of-three pivot and a heapsort
+#   fallback when the partitions are too unbalanced
+#   "three_way": elements equal to the pivot are grouped in a band (in light
+#   blue) and never partitioned again. Fast on arrays with many duplicates
+#   "hoare": two indexes scan from both ends of the subarray and swap the
+#   elements in the wrong part
+#   (both iterative like "introsort", with the same pivot and fallback)
+variant = "lomuto"
+VARIANTS = {
+    "lomuto": sorting.quicksort,
+    "introsort": sorting.introsort,
+    "three_way": sorting.quicksort_three_way,
+    "hoare": sorting.quicksort_hoare,
+}
 
 
-def partition(array, low, high):
-
-    # The pivot is chosen as the last element
-    pivot = array[high]
-    pivot_index = low - 1
-
-    # Indexes of the current partition. To lift the elements slighly higher
-    # than rest of the array
-    lift_indexes = list(range(low, high + 1))
-
+def quicksort(array, low, high):
+    """
+    Animate quicksort by replaying the events of the selected `variant`
+    (e.g. `sorting.quicksort`).
+
+    The algorithm sorts its own copy of `array`; `animate_swap` keeps `array`
+    (the displayed one) in sync. Yield the delays between the steps, so the
+    animation is meant to be run by `scheduler`.
+    """
+    # The subarray currently being partitioned
+    current = None
+    lift_indexes = None
+
+    for event in counter.count(VARIANTS[variant](array[:], low, high)):
+        if event.op == sorting.PARTITION and (event.i, event.j) != current:
+            # A new partition: wait a bit after the previous one
+            if current is not None:
+                yield delay
+            current = (event.i, event.j)
+            # Indexes of the current partition. To lift the elements slighly
+            # higher than rest of the array
+            lift_indexes = range(event.i, event.j + 1)
+
+            draw_array(
+                array,
+                screen,
+                y,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_indexes=range(event.i, event.j + 1),
+                highlight_color=RED,
+                lift_indexes=lift_indexes,
+            )
+            yield 2 * delay
+
+        elif event.op == sorting.PARTITION:
+            # Highlight the partition index: the position where the next
+            # element smaller than the pivot (or the pivot itself) will go
+            draw_array(
+                array,
+                screen,
+                y,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_indexes=[event.value],
+                highlight_color=ORGANGE,
+                pivot_index=event.j,
+                lift_indexes=lift_indexes,
+            )
+            yield delay
+
+        elif event.op == sorting.EQUAL:
+            # The elements equal to the pivot (three-way partition)
+            draw_array(
+                array,
+                screen,
+                y,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_indexes=range(event.i, event.j + 1),
+                highlight_color=LIGHT_BLUE,
+                pivot_index=current[1],
+                lift_indexes=lift_indexes,
+            )
+            yield delay
+
+        elif event.op == sorting.COMPARE:
+            draw_array(
+                array,
+                screen,
+                y,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_indexes=[event.i],
+                pivot_index=event.j,
+                connect_indexes=[event.i, event.j],
+                lift_indexes=lift_indexes,
+            )
+            yield delay
+
+        elif event.op == sorting.SWAP:
+            high = current[1]
+            # Moving the pivot into the partition index is highlighted in blue
+            color = BLUE if event.j == high else ORGANGE
+            draw_array(
+                array,
+                screen,
+                y,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_color=color,
+                pivot_index=high,
+                connect_indexes=[event.i, event.j],
+                lift_indexes=lift_indexes,
+            )
+            yield delay
+            animate_swap(
+                array,
+                event.i,
+                event.j,
+                y,
+                screen,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_color=BLUE if event.j == high else RED,
+                lift_indexes=lift_indexes,
+                duration=scheduler.scale(swap_duration),
+            )
+
+    # The array is sorted: draw it in green
+    Y = (screen_height - rect_height) // 2
     draw_array(
         array,
         screen,
-        y,
+        Y,
         rect_width,
         rect_height,
         clock,
         speed,
         font,
-        highlight_indexes=list(range(low, high + 1)),
-        highlight_color=RED,
-        lift_indexes=lift_indexes,
+        range(len(array)),
+        highlight_color=GREEN,
     )
-    time.sleep(2 * delay)
-
-    for idx in range(low, high):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-        draw_array(
-            array,
-            screen,
-            y,
-            rect_width,
-            rect_height,
-            clock,
-            speed,
-            font,
-            highlight_indexes=[idx],
-            pivot_index=high,
-            connect_indexes=[idx, high],
-            lift_indexes=lift_indexes,
-        )
-        time.sleep(delay)
-
-        # Element left to the pivot must be smaller and elements right to the
-        # pivot must be larger
-        if array[idx] < pivot:
-            # If the current element is less than the pivot, move the pivot index forward
-            pivot_index += 1
-            if pivot_index != idx:
-                draw_array(
-                    array,
-                    screen,
-                    y,
-                    rect_width,
-                    rect_height,
-                    clock,
-                    speed,
-                    font,
-                    highlight_color=ORGANGE,
-                    pivot_index=high,
-                    connect_indexes=[pivot_index, idx],
-                    lift_indexes=lift_indexes,
-                )
-                time.sleep(delay)
-                animate_swap(
-                    array,
-                    pivot_index,
-                    idx,
-                    y,
-                    screen,
-                    rect_width,
-                    rect_height,
-                    clock,
-                    speed,
-                    font,
-                    lift_indexes=lift_indexes,
-                )
-
-        draw_array(
-            array,
-            screen,
-            y,
-            rect_width,
-            rect_height,
-            clock,
-            speed,
-            font,
-            # Pivot index to highlight depending on the initial pivot index
-            highlight_indexes=[pivot_index + 1 if pivot_index > low - 1 else low],
-            highlight_color=ORGANGE,
-            pivot_index=high,
-            lift_indexes=lift_indexes,
-        )
-        time.sleep(delay)
-
-    pivot_index += 1
-    if pivot_index != high and array[pivot_index] != array[high]:
-        draw_array(
-            array,
-            screen,
-            y,
-            rect_width,
-            rect_height,
-            clock,
-            speed,
-            font,
-            highlight_color=BLUE,
-            pivot_index=high,
-            connect_indexes=[pivot_index, high],
-            lift_indexes=lift_indexes,
-        )
-        time.sleep(delay)
-        animate_swap(
-            array,
-            pivot_index,
-            high,
-            y,
-            screen,
-            rect_width,
-            rect_height,
-            clock,
-            speed,
-            font,
-            highlight_color=BLUE,
-            lift_indexes=lift_indexes,
-        )
-
-    return pivot_index
 
 
-def quicksort(array, low, high):
-    if low < high:
-        pivot_index = partition(array, low, high)
-        time.sleep(delay)
-        quicksort(array, low, pivot_index - 1)
-        quicksort(array, pivot_index + 1, high)
+def setup():
+    """
+    Open the window and create the fonts.
+    """
+    global screen, font
+
+    screen = open_window("Quicksort Animation", (screen_width, screen_height))
+    font = glyphs.font(36)
 
 
 def main():
-    running = True
-    quicksort(array, 0, len(array) - 1)
+    setup()
 
-    Y = (screen_height - rect_height) // 2
-    draw_array(
+    run_sort(
+        quicksort(array, 0, len(array) - 1),
+        lambda array: VARIANTS[variant](array, 0, len(array) - 1),
         array,
         screen,
-        Y,
-        rect_width,
-        rect_height,
         clock,
         speed,
-        font,
-        list(range(len(array))),
-        highlight_color=GREEN,
+        scheduler,
+        labelled=num_elements <= max_labelled_elements,
+        stats_file=stats_file,
     )
 
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-    pygame.quit()
-
 
 if __name__ == "__main__":
     array = [random.randint(1, 99) for _ in range(num_elements)]
@@ -0,0 +1,344 @@
+"""
+Race sorting algorithms side by side on the same input.
+
+NOTE every algorithm runs in its own worker process and streams its events to
+this process, which only draws them. The events are sent in chunks of packed
+fixed-width records (see `sort_trace.py`) through a bounded queue, so a worker
+that is far ahead of the animation waits instead of filling the memory. When
+the arrays are drawn as bars, there are too many events per frame to apply
+them here: the workers send a snapshot of their array once per frame instead.
+
+The lanes advance by the same number of events per frame, so the algorithm
+that needs the fewest steps finishes first.
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import multiprocessing as mp
+import queue
+import random
+from collections import deque
+from itertools import islice, starmap
+
+import numpy as np
+import pygame
+import sorting
+from sort_trace import CHUNK_SIZE, event_decoder, event_record, value_format
+from utils import Scheduler, draw_array, draw_bars, glyphs, open_window
+
+# NOTE the worker processes may import this module too (e.g. with the "spawn"
+# start method) and must not open windows of their own (see `open_window`)
+screen_width, screen_height = 1200, 900
+screen = None
+
+# Fonts
+font = None
+title_font = None
+
+
+BLACK = (0, 0, 0)
+BLUE = (58, 148, 255)
+LIGHT_BLUE = (170, 214, 255)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GOLDEN_YELLOW = (255, 215, 0)
+GREEN = (50, 205, 50)
+
+
+# Input array, sorted by every algorithm
+num_elements = 10
+array = [random.randint(1, 99) for _ in range(num_elements)]
+# The value drawn with the full lane height, for bars
+max_value = max(array)
+
+# The algorithms in the race, one lane each from top to bottom
+ALGORITHMS = {
+    "Bubble Sort": sorting.bubble_sort,
+    "Insertion Sort": sorting.insertion_sort,
+    "Quicksort": lambda array: sorting.quicksort(array, 0, len(array) - 1),
+}
+
+# The color of the elements of each kind of event
+COLORS = {
+    sorting.COMPARE: GOLDEN_YELLOW,
+    sorting.SWAP: RED,
+    sorting.PARTITION: LIGHT_BLUE,
+}
+
+lane_height = screen_height // len(ALGORITHMS)
+title_height = 40
+rect_width = max(1, screen_width // num_elements)
+rect_height = 100
+# Beyond this number of elements, the lanes are drawn as bars (see `draw_bars`)
+max_labelled_elements = screen_width // 20
+
+# Number of chunks of events (or snapshots, for bars) a worker can send ahead of
+# the animation
+queue_size = 64
+
+# Control animation speed
+clock = pygame.time.Clock()
+speed = 360  # frame rate
+delay = 0.2  # seconds
+# Runs the animation and keeps the window responsive during the delays
+scheduler = Scheduler(clock)
+
+
+def worker(name, array, events):
+    """
+    Sort `array` with the algorithm `name` and put its events in the queue
+    `events`, in chunks of packed records. `None` marks the end of the events.
+    """
+    pack = event_record(value_format(array)).pack
+    steps = ALGORITHMS[name](array)
+    for chunk in iter(lambda: list(islice(steps, CHUNK_SIZE)), []):
+        events.put(b"".join(starmap(pack, chunk)))
+    events.put(None)
+
+
+def snapshot_worker(name, array, snapshots, events_per_frame):
+    """
+    Sort `array` with the algorithm `name` and put a snapshot of it in the queue
+    `snapshots` every `events_per_frame` events, along with the number of events
+    so far and the last one. `None` marks the end of the sort.
+    """
+    steps = ALGORITHMS[name](array)
+    count = 0
+    for chunk in iter(lambda: list(islice(steps, events_per_frame)), []):
+        count += len(chunk)
+        snapshot = np.array(array)
+        if len(chunk) == events_per_frame:
+            # The sort is paused on its last event, which it has not applied yet
+            sorting.apply_event(snapshot, chunk[-1])
+        snapshots.put((snapshot, count, chunk[-1]))
+    snapshots.put(None)
+
+
+class Lane:
+    """
+    One algorithm of the race: its copy of the array and the events received
+    from its worker that are not applied yet. Every frame, `events_per_frame`
+    of them are applied.
+    """
+
+    def __init__(self, name, array, events, events_per_frame=1):
+        self.name = name
+        self.array = array
+        self.events = events
+        self.events_per_frame = events_per_frame
+        type_code = value_format(array)
+        self._record = event_record(type_code)
+        self._decode = event_decoder(type_code)
+        self._pending = deque()
+        self._received_all = False
+
+        self.count = 0  # number of events applied
+        self.last_event = None
+        self.place = None  # 1 for the winner, ... (once finished)
+
+    @property
+    def finished(self):
+        return self._received_all and not self._pending
+
+    def advance(self):
+        """
+        Apply up to `events_per_frame` events to the array. Never wait for the
+        worker: if its next events have not arrived yet, apply fewer.
+        """
+        for _ in range(self.events_per_frame):
+            if not self._pending:
+                if self._received_all:
+                    return
+                try:
+                    chunk = self.events.get_nowait()
+                except queue.Empty:
+                    return
+                if chunk is None:
+                    self._received_all = True
+                    return
+                records = self._record.iter_unpack(chunk)
+                self._pending.extend(map(self._decode, records))
+
+            event = self._pending.popleft()
+            sorting.apply_event(self.array, event)
+            self.count += 1
+            self.last_event = event
+
+
+class SnapshotLane:
+    """
+    A lane drawn as bars: its worker (see `snapshot_worker`) applies the events
+    itself, so the lane only takes the next snapshot of the array every frame.
+    """
+
+    def __init__(self, name, array, snapshots):
+        self.name = name
+        self.array = array
+        self.snapshots = snapshots
+        self.finished = False
+
+        self.count = 0  # number of events applied
+        self.last_event = None
+        self.place = None  # 1 for the winner, ... (once finished)
+
+    def advance(self):
+        """
+        Take the next snapshot of the array, if it has arrived.
+        """
+        if self.finished:
+            return
+        try:
+            message = self.snapshots.get_nowait()
+        except queue.Empty:
+            return
+        if message is None:
+            self.finished = True
+            return
+        self.array, self.count, self.last_event = message
+
+
+def draw_lane(k, lane, labelled):
+    """
+    Draw `lane` in the k-th band of the screen: its name and number of events,
+    then its array, with the elements of its last event highlighted.
+    """
+    top = k * lane_height
+    title = f"{lane.name}: {lane.count} events"
+    if lane.place is not None:
+        title += f" (#{lane.place})"
+    screen.blit(glyphs.render(title, WHITE, title_font), (10, top + 10))
+
+    event = lane.last_event
+    if lane.finished:
+        highlight_indexes, highlight_color = range(len(lane.array)), GREEN
+    elif event is None:
+        highlight_indexes, highlight_color = None, None
+    elif event.op == sorting.PARTITION:
+        highlight_indexes = range(event.i, event.j + 1)
+        highlight_color = COLORS[event.op]
+    else:
+        highlight_indexes = [event.i, event.j]
+        highlight_color = COLORS.get(event.op, RED)
+
+    if labelled:
+        draw_array(
+            lane.array,
+            screen,
+            top + (lane_height + title_height - rect_height) // 2,
+            rect_width,
+            rect_height,
+            clock,
+            speed,
+            font,
+            highlight_indexes=highlight_indexes,
+            highlight_color=highlight_color,
+            erase=False,
+            flip=False,
+        )
+    else:
+        surface = screen.subsurface(
+            (0, top + title_height, screen_width, lane_height - title_height)
+        )
+        if lane.finished:
+            draw_bars(
+                lane.array,
+                surface,
+                clock,
+                speed,
+                max_value,
+                color=GREEN,
+                band_color=GREEN,
+                flip=False,
+            )
+        else:
+            draw_bars(
+                lane.array,
+                surface,
+                clock,
+                speed,
+                max_value,
+                highlight_indexes=[event.i, event.j] if event else None,
+                flip=False,
+            )
+
+
+def race(lanes, labelled):
+    """
+    Advance every lane by one frame and draw all of them, until every algorithm
+    is finished.
+
+    Yield the delays between the frames, so the animation is meant to be run
+    by `scheduler`.
+    """
+    places = 0
+
+    while True:
+        for lane in lanes:
+            if lane.finished:
+                continue
+            lane.advance()
+            if lane.finished:
+                places += 1
+                lane.place = places
+
+        screen.fill(BLACK)
+        for k, lane in enumerate(lanes):
+            draw_lane(k, lane, labelled)
+        pygame.display.flip()
+        clock.tick(speed)
+
+        if places == len(lanes):
+            return
+        yield delay if labelled else 0
+
+
+def setup():
+    """
+    Open the window and create the fonts.
+    """
+    global screen, font, title_font
+
+    screen = open_window("Sorting Race", (screen_width, screen_height))
+    font = glyphs.font(36)
+    title_font = glyphs.font(30)
+
+
+def main():
+    setup()
+
+    running = True
+    labelled = num_elements <= max_labelled_elements
+
+    # One event per frame, or one per `len(array)` events for bars
+    events_per_frame = 1 if labelled else max(1, len(array))
+
+    lanes = []
+    for name in ALGORITHMS:
+        messages = mp.Queue(queue_size)
+        if labelled:
+            args = (name, array[:], messages)
+            process = mp.Process(target=worker, args=args)
+            lanes.append(Lane(name, array[:], messages, events_per_frame))
+        else:
+            args = (name, array[:], messages, events_per_frame)
+            process = mp.Process(target=snapshot_worker, args=args)
+            lanes.append(SnapshotLane(name, np.array(array), messages))
+        # Do not wait for the workers if the window is closed mid-race
+        process.daemon = True
+        process.start()
+
+    scheduler.run(race(lanes, labelled))
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+
+    main()
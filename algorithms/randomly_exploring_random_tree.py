@@ -10,6 +10,8 @@ import pyglet
 import random
 import math
 
+from assets import assets
+
 # Screen dimensions
 screen_width = 750
 screen_height = 750
@@ -37,13 +39,10 @@ num_obstacles = 30
 
 vertices = [INIT_VERTEX]
 
-window = pyglet.window.Window(screen_width, screen_height)
-batch = pyglet.graphics.Batch()
-pyglet.resource.path = ["../resources"]
-pyglet.resource.reindex()
-OBSTACLE_IMAGE = pyglet.resource.image("square.png")
-OBSTACLE_IMAGE.anchor_x = OBSTACLE_IMAGE.width / 2
-OBSTACLE_IMAGE.anchor_y = OBSTACLE_IMAGE.height / 2
+# NOTE nothing is created when the module is imported: `setup` opens the
+# window, loads the obstacle image and places the obstacles
+window = None
+batch = None
 
 
 def distance(point1, point2):
@@ -61,40 +60,36 @@ def extension(nearest_vertex, rand_vertex, delta):
 
 
 # obstracles will be scaled by this factor; see below
-obstacle_size = 0.3 * OBSTACLE_IMAGE.width / 2
-obstacle_radius = math.sqrt(2) * obstacle_size
+obstacle_scale = 0.3
+obstacle_radius = None  # set by `setup`, from the size of the obstacle image
 obstacles_coord = []  # Coordinates of the obstacles
 
-
-# Calc the coordinates of the obstacles while considering the initial vertex, target, and existing obstacles
-for _ in range(num_obstacles):
-    # If the current obstacle collide with an existing object, keep looking for a new position
-    while True:
-        x = random.random() * (screen_width - obstacle_radius)
-        y = random.random() * (screen_height - obstacle_radius)
-        # Check if the current position is available
-        if (
-            distance((x, y), target_coord) >= obstacle_radius
-            and distance((x, y), INIT_VERTEX) >= obstacle_radius
-            and all(
-                distance((x, y), obs) >= 2 * obstacle_radius for obs in obstacles_coord
-            )
-        ):
-            obstacles_coord.append((x, y))
-            break
-
-
-# Create obstacles
-obstacle_sprites = [
-    pyglet.sprite.Sprite(OBSTACLE_IMAGE, x, y, batch=batch) for x, y in obstacles_coord
-]
-for sprite in obstacle_sprites:
-    sprite.scale = 0.3
-
-# Draw target
-target_circle = pyglet.shapes.Circle(
-    target_coord[0], target_coord[1], RADIUS, color=(250, 0, 0), batch=batch
-)
+# The sprites of the obstacles and the target (created by `setup`)
+obstacle_sprites = []
+target_circle = None
+
+
+def place_obstacles(obstacle_radius):
+    """
+    Return the coordinates of `num_obstacles` obstacles, away from the initial
+    vertex, the target and each other.
+    """
+    coords = []
+    # Calc the coordinates of the obstacles while considering the initial vertex, target, and existing obstacles
+    for _ in range(num_obstacles):
+        # If the current obstacle collide with an existing object, keep looking for a new position
+        while True:
+            x = random.random() * (screen_width - obstacle_radius)
+            y = random.random() * (screen_height - obstacle_radius)
+            # Check if the current position is available
+            if (
+                distance((x, y), target_coord) >= obstacle_radius
+                and distance((x, y), INIT_VERTEX) >= obstacle_radius
+                and all(distance((x, y), obs) >= 2 * obstacle_radius for obs in coords)
+            ):
+                coords.append((x, y))
+                break
+    return coords
 
 
 # Tree
@@ -154,13 +149,43 @@ def update(dt):
             current_node = parent_node
 
 
-@window.event
 def on_draw():
     window.clear()
     batch.draw()
 
 
+def setup():
+    """
+    Open the window, place the obstacles and create the sprites.
+    """
+    global window, batch, obstacle_radius, obstacles_coord, obstacle_sprites
+    global target_circle
+
+    window = pyglet.window.Window(screen_width, screen_height)
+    window.event(on_draw)
+    batch = pyglet.graphics.Batch()
+    obstacle_image = assets.pyglet_image("square.png", centered=True)
+
+    obstacle_size = obstacle_scale * obstacle_image.width / 2
+    obstacle_radius = math.sqrt(2) * obstacle_size
+    obstacles_coord = place_obstacles(obstacle_radius)
+
+    # Create obstacles
+    obstacle_sprites = [
+        pyglet.sprite.Sprite(obstacle_image, x, y, batch=batch)
+        for x, y in obstacles_coord
+    ]
+    for sprite in obstacle_sprites:
+        sprite.scale = obstacle_scale
+
+    # Draw target
+    target_circle = pyglet.shapes.Circle(
+        target_coord[0], target_coord[1], RADIUS, color=(250, 0, 0), batch=batch
+    )
+
+
 # Schedule the update function
 if __name__ == "__main__":
+    setup()
     pyglet.clock.schedule_interval(update, 1 / 20.0)
     pyglet.app.run()
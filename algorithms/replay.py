@@ -0,0 +1,291 @@
+"""
+Replay a recorded sorting trace (see `sort_trace.py`).
+
+NOTE the algorithm is not run again: the events are read from the trace file,
+which is memory-mapped, so even traces of millions of events can be replayed.
+
+Press RIGHT/LEFT to jump forward/back in the trace, and HOME/END to jump to its
+start/end. A jump rebuilds the array from the nearest keyframe (a snapshot of
+the array stored every `keyframe_interval` events), so it costs at most
+`keyframe_interval` event applications wherever it lands. The keyframes are
+taken while the replay plays, a chunk of events per step: a jump past the last
+one taken waits for it, without freezing the window.
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import math
+import os
+import random
+
+import numpy as np
+import pygame
+import sorting
+from sort_trace import Keyframes, Trace, record
+from utils import Scheduler, draw_array, animate_swap, draw_bars, glyphs, open_window
+
+screen_width, screen_height = 1200, 600
+screen = None
+
+# Font
+font = None
+
+
+BLACK = (0, 0, 0)
+BLUE = (58, 148, 255)
+LIGHT_BLUE = (170, 214, 255)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GOLDEN_YELLOW = (255, 215, 0)
+GREEN = (50, 205, 50)
+
+
+# The trace to replay. If the file does not exist, it is recorded first by
+# sorting `num_elements` random numbers with `algorithm`
+trace_file = "sorting.trace"
+num_elements = 10
+algorithm = "introsort"
+ALGORITHMS = {
+    "bubble": sorting.bubble_sort,
+    "insertion": sorting.insertion_sort,
+    "shell": sorting.shell_sort,
+    "quicksort": lambda array: sorting.quicksort(array, 0, len(array) - 1),
+    "introsort": lambda array: sorting.introsort(array, 0, len(array) - 1),
+    "heapsort": lambda array: sorting.heapsort(array, 0, len(array) - 1),
+    "merge": sorting.merge_sort,
+    "radix": sorting.radix_sort,
+}
+
+rect_height = 100
+# Beyond this number of elements, the array is drawn as bars (see `draw_bars`)
+max_labelled_elements = screen_width // 20
+# Place the array in the middle of the screen (roughly)
+y = screen_height // 2
+
+# Control animation speed
+clock = pygame.time.Clock()
+speed = 360  # frame rate
+delay = 0.3  # seconds
+swap_duration = 0.5  # seconds per swap
+# Runs the animation and keeps the window responsive during the delays
+scheduler = Scheduler(clock)
+
+# Seeking
+seek_step = 0.05  # fraction of the trace skipped by RIGHT/LEFT
+keyframe_interval = 100  # events between two keyframes
+keyframe_chunk = 20_000  # events applied per step to take the keyframes
+# The keyframes of a large array take a lot of memory: the interval is
+# increased to keep them under this size
+max_keyframe_bytes = 256 * 2**20
+
+# The index of the next event to replay, and the index to jump to (set by the
+# keys, applied by the replay at its next step)
+position = 0
+seek_target = None
+
+
+def seek(k):
+    global seek_target
+    seek_target = k
+
+
+def keyframes(trace):
+    """
+    Return the `Keyframes` of `trace`, with an interval of `keyframe_interval`
+    events or more if needed to stay under `max_keyframe_bytes`.
+
+    NOTE no snapshot is taken yet: the replays take them with `Keyframes.build`.
+    """
+    array_bytes = 8 * max(len(trace.array), 1)
+    max_keyframes = max(1, max_keyframe_bytes // array_bytes)
+    interval = max(keyframe_interval, math.ceil(len(trace) / max_keyframes))
+    return Keyframes(trace, interval)
+
+
+def replay(trace, keyframes):
+    """
+    Animate the events of `trace` on its array, using the same colors as the
+    animated scripts: the current subarray in red, compared elements in yellow
+    and written elements in green.
+
+    Yield the delays between the steps, so the animation is meant to be run by
+    `scheduler`. At the end of the trace, wait for a jump back.
+    """
+    global position, seek_target
+
+    array = trace.array
+    rect_width = max(1, screen_width // max(len(array), 1))
+
+    def draw(highlight_indexes=None, highlight_color=GOLDEN_YELLOW, **kwargs):
+        draw_array(
+            array,
+            screen,
+            y,
+            rect_width,
+            rect_height,
+            clock,
+            speed,
+            font,
+            highlight_indexes=highlight_indexes,
+            highlight_color=highlight_color,
+            **kwargs,
+        )
+
+    position = 0
+    draw()
+    yield delay
+
+    while True:
+        keyframes.build(keyframe_chunk)
+        if seek_target is not None and not keyframes.covers(seek_target):
+            # Wait for the keyframe to jump from
+            yield 0
+            continue
+
+        if seek_target is not None:
+            position = min(max(seek_target, 0), len(trace))
+            seek_target = None
+            array[:] = keyframes.seek(position)
+            draw(range(len(array)) if position == len(trace) else None, GREEN)
+            yield delay
+            continue
+
+        if position == len(trace):
+            yield delay
+            continue
+
+        event = trace[position]
+        position += 1
+
+        if event.op == sorting.SWAP:
+            animate_swap(
+                array,
+                event.i,
+                event.j,
+                y,
+                screen,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                duration=scheduler.scale(swap_duration),
+            )
+        elif event.op in (sorting.WRITE, sorting.SHIFT):
+            sorting.apply_event(array, event)
+            draw(range(event.i, max(event.i, event.j) + 1), GREEN)
+            yield delay
+        elif event.op == sorting.COMPARE:
+            draw([event.i, event.j], connect_indexes=[event.i, event.j])
+            yield delay
+        elif event.op == sorting.PARTITION:
+            draw(range(event.i, event.j + 1), RED)
+            yield delay
+        elif event.op == sorting.EQUAL:
+            draw(range(event.i, event.j + 1), LIGHT_BLUE)
+            yield delay
+        elif event.op == sorting.BUFFER:
+            # array[j] is copied to the buffer of merge sort, which is not drawn
+            draw([event.j], BLUE)
+            yield delay
+        elif event.op == sorting.BUCKET:
+            draw([event.i], BLUE)
+            yield delay
+
+        if position == len(trace):
+            draw(range(len(array)), GREEN)
+
+
+def replay_bars(trace, keyframes, events_per_frame=None):
+    """
+    Like `replay`, but draw the array as bars with `draw_bars`, one frame every
+    `events_per_frame` events (by default, one per `len(array)` events).
+    """
+    global position, seek_target
+
+    values = np.array(trace.array)
+    max_value = values.max() if len(values) else 1
+    events_per_frame = events_per_frame or max(1, len(values))
+
+    position = 0
+    draw_bars(values, screen, clock, speed, max_value)
+
+    while True:
+        keyframes.build(keyframe_chunk)
+        if seek_target is not None and not keyframes.covers(seek_target):
+            # Wait for the keyframe to jump from
+            yield 0
+            continue
+
+        highlight_indexes = None
+        if seek_target is not None:
+            position = min(max(seek_target, 0), len(trace))
+            seek_target = None
+            values[:] = keyframes.seek(position)
+        elif position < len(trace):
+            stop = min(position + events_per_frame, len(trace))
+            for event in trace.events(position, stop):
+                sorting.apply_event(values, event)
+            position = stop
+            highlight_indexes = [event.i, event.j]
+        else:
+            yield delay
+            continue
+
+        if position == len(trace):
+            draw_bars(
+                values, screen, clock, speed, max_value, color=GREEN, band_color=GREEN
+            )
+        else:
+            draw_bars(
+                values,
+                screen,
+                clock,
+                speed,
+                max_value,
+                highlight_indexes=highlight_indexes,
+            )
+        yield 0
+
+
+def setup():
+    """
+    Open the window and create the fonts.
+    """
+    global screen, font
+
+    screen = open_window("Sorting Replay", (screen_width, screen_height))
+    font = glyphs.font(36)
+
+
+def main():
+    setup()
+
+    if not os.path.exists(trace_file):
+        array = [random.randint(1, 99) for _ in range(num_elements)]
+        record(trace_file, array, ALGORITHMS[algorithm](array[:]))
+
+    # The replay runs until Q is pressed (or the window is closed)
+    with Trace(trace_file) as trace:
+        step = max(1, round(seek_step * len(trace)))
+        scheduler.key_bindings.update(
+            {
+                pygame.K_RIGHT: lambda: seek(position + step),
+                pygame.K_LEFT: lambda: seek(position - step),
+                pygame.K_HOME: lambda: seek(0),
+                pygame.K_END: lambda: seek(len(trace)),
+            }
+        )
+
+        if len(trace.array) > max_labelled_elements:
+            # Too many elements to label: draw the array as bars instead
+            scheduler.run(replay_bars(trace, keyframes(trace)))
+        else:
+            scheduler.run(replay(trace, keyframes(trace)))
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,278 @@
+"""
+Record the events of a sorting algorithm (see `sorting.py`) into a compact
+binary trace file, and read them back.
+
+A trace file is made of
+    1. A header: a magic number, the format version, the type of the values
+    ('q' for integers, 'd' for floats) and the length of the array
+    2. The array before sorting, one 8-byte value per element
+    3. The events, one fixed-width record (op code, i, j, value) per event
+
+Everything is little-endian. `Trace` memory-maps the file and decodes the
+records in small chunks, so a trace of millions of events can be replayed
+without holding them in memory as Python objects. `Keyframes` keeps periodic
+copies of the array, so a replay can jump to any event without replaying every
+event before it.
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import mmap
+import numbers
+import struct
+import sys
+from array import array as typed_array
+from itertools import islice, starmap
+
+from sorting import WRITE, Event, apply_event
+
+MAGIC = b"SRTT"
+VERSION = 1
+
+# Magic number, version, value type and length of the array
+HEADER = struct.Struct("<4sBcxxQ")
+
+# Number of events encoded or decoded at a time
+CHUNK_SIZE = 4096
+
+
+def event_record(value_format):
+    """
+    Return the `struct.Struct` of a single event: a 1-byte op code, two 4-byte
+    indexes and an 8-byte value (17 bytes, without padding).
+    """
+    return struct.Struct("<Bii" + value_format)
+
+
+def event_decoder(value_format):
+    """
+    Return the function that turns the fields of an unpacked event record into
+    a `sorting.Event`.
+    """
+    if value_format == "q":
+        return Event._make
+    return _decode_float_event
+
+
+def _decode_float_event(fields):
+    event = Event._make(fields)
+    # In a trace of floats, the values that are indexes (e.g. the boundary of a
+    # partition or a bucket number) are floats as well
+    if event.op != WRITE:
+        event = event._replace(value=int(event.value))
+    return event
+
+
+def value_format(array):
+    """
+    Return the `array` type code of the values of `array` in a trace: 'q' if
+    they are all integers, 'd' otherwise.
+    """
+    if all(isinstance(value, numbers.Integral) for value in array):
+        return "q"
+    return "d"
+
+
+def record(path, array, steps):
+    """
+    Write `array` (as it is before sorting) and the events of `steps` (e.g.
+    `sorting.heapsort(array[:], 0, len(array) - 1)`) to the trace file `path`.
+
+    Return the number of events written.
+    """
+    type_code = value_format(array)
+    pack = event_record(type_code).pack
+
+    values = typed_array(type_code, array)
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    count = 0
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, type_code.encode(), len(array)))
+        file.write(values.tobytes())
+
+        # Encode the events in chunks, so `steps` is never exhausted into a list
+        for chunk in iter(lambda: list(islice(steps, CHUNK_SIZE)), []):
+            file.write(b"".join(starmap(pack, chunk)))
+            count += len(chunk)
+
+    return count
+
+
+class Trace:
+    """
+    A memory-mapped trace file written by `record`.
+
+    Iterating over a trace yields its events (as `sorting.Event`) in order;
+    `trace[k]` reads the k-th event directly. `array` is the array before
+    sorting, to replay the events on.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped
+            self._file.close()
+            raise ValueError(f"{path} is not a trace file")
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a trace file")
+        magic, version, value_format, length = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a trace file")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported trace version {version} in {path}")
+
+        self.value_format = value_format.decode()
+        self._record = event_record(self.value_format)
+        self._decode = event_decoder(self.value_format)
+        self._values_offset = HEADER.size
+        self._events_offset = self._values_offset + 8 * length
+        self._num_events = (len(self._mmap) - self._events_offset) // self._record.size
+
+    @property
+    def array(self):
+        """
+        A new list with the array before sorting.
+        """
+        values = typed_array(
+            self.value_format,
+            self._mmap[self._values_offset : self._events_offset],
+        )
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values.tolist()
+
+    def __len__(self):
+        return self._num_events
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += self._num_events
+        if not 0 <= k < self._num_events:
+            raise IndexError("trace index out of range")
+        offset = self._events_offset + k * self._record.size
+        return self._decode(self._record.unpack_from(self._mmap, offset))
+
+    def __iter__(self):
+        return self.events()
+
+    def events(self, start=0, stop=None):
+        """
+        Yield the events `start` to `stop - 1` (by default, all of them).
+
+        Only `CHUNK_SIZE` records are copied out of the file at a time.
+        """
+        stop = self._num_events if stop is None else min(stop, self._num_events)
+        size = self._record.size
+        end = self._events_offset + stop * size
+        chunk_bytes = CHUNK_SIZE * size
+
+        for offset in range(self._events_offset + start * size, end, chunk_bytes):
+            chunk = self._mmap[offset : min(offset + chunk_bytes, end)]
+            yield from map(self._decode, self._record.iter_unpack(chunk))
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Keyframes:
+    """
+    Snapshots of the array of a trace every `interval` events, so the array
+    after any number of events is rebuilt by applying at most `interval` events
+    to the nearest snapshot.
+
+    The snapshots are taken in order by `build`, a chunk of events at a time,
+    e.g. one chunk per frame of a replay. A seek past the last snapshot taken
+    applies every event up to it, so wait until `covers` it to seek there (or
+    until `build` returns True). Each snapshot takes 8 bytes per element: a
+    larger `interval` uses less memory but makes seeking slower.
+    """
+
+    def __init__(self, trace, interval=1000):
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+        self.trace = trace
+        self.interval = interval
+        # The k-th snapshot is the array after the first k * interval events
+        self._snapshots = [typed_array(trace.value_format, trace.array)]
+        # The array after the first `_position` events, to take the next
+        # snapshots from
+        self._array = list(trace.array)
+        self._position = 0
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    @property
+    def complete(self):
+        """
+        Whether all the snapshots are taken.
+        """
+        return len(self._snapshots) > len(self.trace) // self.interval
+
+    def build(self, max_events=None):
+        """
+        Take the next snapshots, applying at most `max_events` events of the
+        trace (every event left by default). A snapshot may be taken over
+        several calls.
+
+        Return True once all the snapshots are taken.
+        """
+        # The events after the last snapshot are not needed
+        end = (len(self.trace) // self.interval) * self.interval
+        if max_events is not None:
+            end = min(end, self._position + max_events)
+
+        while self._position < end:
+            # Apply the events up to the next snapshot (or to `end`)
+            next_snapshot = len(self._snapshots) * self.interval
+            stop = min(next_snapshot, end)
+            for event in self.trace.events(self._position, stop):
+                apply_event(self._array, event)
+            self._position = stop
+            if stop == next_snapshot:
+                self._snapshots.append(
+                    typed_array(self.trace.value_format, self._array)
+                )
+
+        if self.complete:
+            self._array = None
+        return self.complete
+
+    def covers(self, k):
+        """
+        Return whether the snapshot `seek(k)` starts from is taken.
+        """
+        k = min(max(k, 0), len(self.trace))
+        return k // self.interval < len(self._snapshots)
+
+    def seek(self, k):
+        """
+        Return a new list with the array after the first `k` events of the trace
+        (clipped to the start and the end of the trace).
+        """
+        k = min(max(k, 0), len(self.trace))
+        n = k // self.interval
+        if n >= len(self._snapshots):
+            self.build(n * self.interval - self._position)
+
+        array = self._snapshots[n].tolist()
+        for event in self.trace.events(n * self.interval, k):
+            apply_event(array, event)
+        return array
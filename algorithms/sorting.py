@@ -0,0 +1,614 @@
+"""
+Headless sorting algorithms.
+
+Every sort in this module is a generator. Instead of drawing anything, it
+yields small `Event` tuples describing what the algorithm is doing (comparing
+two elements, swapping them, ...). The animated scripts (`bubble_sort.py`,
+`insertion_sort.py`, `quicksort.py`) are just one consumer of these events;
+benchmarks can simply exhaust the generator with `run` and sort at native speed.
+
+NOTE events are yielded *before* they are applied to the array, so a consumer
+sees the array as it was when the decision was made. A consumer that keeps its
+own copy of the array (e.g. for drawing) can stay in sync with `apply_event`.
+"""
+
+__author__ = "Ahmed Hassan"
+__license__ = "MIT"
+__email__ = "ahmedhassan@aims.ac.za"
+
+import math
+from collections import deque, namedtuple
+
+import numpy as np
+
+# Operation codes
+COMPARE = 0  # compare array[i] and array[j]
+SWAP = 1  # swap array[i] and array[j]
+WRITE = 2  # array[i] = value
+PARTITION = 3  # working on the subarray array[i..j]; `value` is the boundary index
+EQUAL = 4  # array[i..j] are equal to the pivot
+SHIFT = 5  # move array[j] to i, shifting array[i..j-1] one position right
+BUFFER = 6  # buffer[i] = array[j], where `buffer` is the auxiliary array of merge sort
+BUCKET = 7  # array[i] goes into bucket number `value` (counting and radix sort)
+DEPTH = 8  # the explicit stack of an iterative sort is `value` subarrays deep
+
+OP_NAMES = {
+    COMPARE: "compare",
+    SWAP: "swap",
+    WRITE: "write",
+    PARTITION: "partition",
+    EQUAL: "equal",
+    SHIFT: "shift",
+    BUFFER: "buffer",
+    BUCKET: "bucket",
+}
+
+# NOTE DEPTH is not an operation on the array: it has no name above, and it is
+# only yielded when the stack is deeper than ever before (see `_introsort_loop`)
+
+# A single step of a sorting algorithm
+Event = namedtuple("Event", ["op", "i", "j", "value"], defaults=(-1, 0))
+
+
+def apply_event(array, event):
+    """
+    Apply `event` to `array`. Events that do not modify the array are ignored.
+    """
+    if event.op == SWAP:
+        array[event.i], array[event.j] = array[event.j], array[event.i]
+    elif event.op == WRITE:
+        array[event.i] = event.value
+    elif event.op == SHIFT:
+        value = array[event.j]
+        array[event.i + 1 : event.j + 1] = array[event.i : event.j]
+        array[event.i] = value
+
+
+def run(steps):
+    """
+    Exhaust the generator `steps` without doing anything with its events.
+    """
+    deque(steps, maxlen=0)
+
+
+def bubble_sort(array):
+    n = len(array)
+    while n >= 1:
+        # The last swap position. Everything after it is already sorted
+        k = 0
+        for i in range(1, n):
+            yield Event(COMPARE, i - 1, i)
+            if array[i - 1] > array[i]:
+                yield Event(SWAP, i - 1, i)
+                array[i - 1], array[i] = array[i], array[i - 1]
+                k = i
+        n = k
+
+
+def insertion_sort(array):
+    for j in range(1, len(array)):
+        # array[0..j-1] is sorted; array[j] is the element to insert
+        yield Event(PARTITION, 0, j, j)
+        key = array[j]
+        i = j - 1
+        while i >= 0:
+            yield Event(COMPARE, i, i + 1)
+            if array[i] <= key:
+                break
+            # Shift the larger element one step to the right
+            yield Event(SWAP, i, i + 1)
+            array[i], array[i + 1] = array[i + 1], array[i]
+            i -= 1
+
+
+def binary_insertion_sort(array):
+    """
+    Insertion sort that finds the position of each element with a binary
+    search and moves it there with a single shift of the larger elements.
+
+    Only O(log(n)) comparisons are needed per element. The shift still moves
+    O(n) elements, but it is one `SHIFT` event instead of one swap per element.
+    """
+    for j in range(1, len(array)):
+        yield Event(PARTITION, 0, j, j)
+        key = array[j]
+
+        # The first element of array[0..j-1] larger than the key (keeps the
+        # sort stable)
+        lo, hi = 0, j
+        while lo < hi:
+            mid = (lo + hi) // 2
+            yield Event(COMPARE, mid, j)
+            if array[mid] > key:
+                hi = mid
+            else:
+                lo = mid + 1
+
+        if lo != j:
+            yield Event(SHIFT, lo, j)
+            array[lo + 1 : j + 1] = array[lo:j]
+            array[lo] = key
+
+
+def ciura_gaps(n):
+    """
+    Ciura's gap sequence (extended by a factor of 2.25), largest first.
+    """
+    gaps = [1, 4, 10, 23, 57, 132, 301, 701]
+    while gaps[-1] < n:
+        gaps.append(int(gaps[-1] * 2.25))
+    return [gap for gap in reversed(gaps) if gap < n]
+
+
+def tokuda_gaps(n):
+    """
+    Tokuda's gap sequence ceil((9 * (9/4)^k - 4) / 5), largest first.
+    """
+    gaps = []
+    k = 0
+    while True:
+        gap = math.ceil((9 * (9 / 4) ** k - 4) / 5)
+        if gap >= n:
+            break
+        gaps.append(gap)
+        k += 1
+    return gaps[::-1]
+
+
+GAP_SEQUENCES = {"ciura": ciura_gaps, "tokuda": tokuda_gaps}
+
+
+def shell_sort(array, gaps="ciura"):
+    """
+    Insertion sort over elements `gap` positions apart, for a decreasing
+    sequence of gaps ending with 1 (a plain insertion sort).
+
+    The large gaps move elements far in a few swaps, so the final insertion
+    sort has little left to do. `gaps` is the name of the gap sequence in
+    `GAP_SEQUENCES`.
+    """
+    n = len(array)
+    for gap in GAP_SEQUENCES[gaps](n):
+        for j in range(gap, n):
+            i = j
+            while i >= gap:
+                yield Event(COMPARE, i - gap, i)
+                if array[i - gap] <= array[i]:
+                    break
+                yield Event(SWAP, i - gap, i)
+                array[i - gap], array[i] = array[i], array[i - gap]
+                i -= gap
+
+
+def comb_sort(array, shrink=1.3):
+    """
+    Bubble sort over elements `gap` positions apart, where the gap shrinks by
+    `shrink` after every pass.
+
+    Small elements near the end of the array (the "turtles" that make bubble
+    sort slow) are moved far in a few swaps. Once the gap reaches 1, it is a
+    plain bubble sort that stops after a pass without swaps.
+    """
+    n = len(array)
+    gap = n
+    done = False
+    while not done:
+        gap = int(gap / shrink)
+        if gap <= 1:
+            gap = 1
+            done = True
+
+        for i in range(n - gap):
+            yield Event(COMPARE, i, i + gap)
+            if array[i] > array[i + gap]:
+                yield Event(SWAP, i, i + gap)
+                array[i], array[i + gap] = array[i + gap], array[i]
+                done = False
+
+
+def partition(array, low, high):
+    """
+    Lomuto partition of array[low..high] around the last element.
+
+    Return the final index of the pivot (through `StopIteration.value`, i.e.
+    `pivot_index = yield from partition(...)`).
+    """
+    # The pivot is chosen as the last element
+    pivot = array[high]
+    # The next position for an element smaller than the pivot
+    store = low
+    yield Event(PARTITION, low, high, store)
+
+    for idx in range(low, high):
+        yield Event(COMPARE, idx, high)
+        if array[idx] < pivot:
+            if store != idx:
+                yield Event(SWAP, store, idx)
+                array[store], array[idx] = array[idx], array[store]
+            store += 1
+        yield Event(PARTITION, low, high, store)
+
+    # Move the pivot into its final position
+    if store != high and array[store] != array[high]:
+        yield Event(SWAP, store, high)
+        array[store], array[high] = array[high], array[store]
+
+    return store
+
+
+def quicksort(array, low, high):
+    if low < high:
+        pivot_index = yield from partition(array, low, high)
+        yield from quicksort(array, low, pivot_index - 1)
+        yield from quicksort(array, pivot_index + 1, high)
+
+
+def median_of_three(array, low, high, move_to_end=True):
+    """
+    Move the median of array[low], array[mid] and array[high] to array[high],
+    where `partition` expects the pivot. If not `move_to_end`, the median is
+    left in the middle, where `partition_hoare` takes it.
+    """
+    mid = (low + high) // 2
+    # Sort the three elements in place: array[low] <= array[mid] <= array[high]
+    for i, j in ((low, mid), (mid, high), (low, mid)):
+        yield Event(COMPARE, i, j)
+        if array[j] < array[i]:
+            yield Event(SWAP, i, j)
+            array[i], array[j] = array[j], array[i]
+
+    # The median is now in the middle
+    if move_to_end:
+        yield Event(SWAP, mid, high)
+        array[mid], array[high] = array[high], array[mid]
+
+
+def sift_down(array, low, root, end):
+    """
+    Sift array[root] down the max-heap stored in array[low..end].
+    """
+    while True:
+        child = low + 2 * (root - low) + 1
+        if child > end:
+            return
+
+        # The larger of the two children
+        if child + 1 <= end:
+            yield Event(COMPARE, child, child + 1)
+            if array[child] < array[child + 1]:
+                child += 1
+
+        yield Event(COMPARE, root, child)
+        if array[root] >= array[child]:
+            return
+        yield Event(SWAP, root, child)
+        array[root], array[child] = array[child], array[root]
+        root = child
+
+
+def heapsort(array, low, high):
+    """
+    Heapsort array[low..high] in place, in O(n log(n)) time even in the worst
+    case.
+
+    The children of array[k] are array[2k + 1] and array[2k + 2] (relative to
+    `low`). Every time the largest element is moved to the end, the heap
+    shrinks to array[low..end - 1], which is reported with a PARTITION event.
+    """
+    # Turn the subarray into a max-heap, starting from the last parent
+    for root in range(low + (high - low - 1) // 2, low - 1, -1):
+        yield from sift_down(array, low, root, high)
+
+    # Repeatedly move the largest element to the end of the heap
+    for end in range(high, low, -1):
+        yield Event(SWAP, low, end)
+        array[low], array[end] = array[end], array[low]
+        yield Event(PARTITION, low, end - 1, low)
+        yield from sift_down(array, low, low, end - 1)
+
+
+def _introsort_loop(array, low, high, max_depth, partition_step):
+    """
+    The loop shared by the iterative quicksorts below.
+
+    `partition_step(array, low, high)` partitions array[low..high] and returns
+    `(left, right)`: the parts left to sort are array[low..left] and
+    array[right..high]. The larger part is pushed on an explicit stack and the
+    smaller one is processed right away, so the stack holds at most log2(n)
+    entries (its depth is reported with DEPTH events). If the partitions keep being unbalanced (more than `max_depth`
+    levels, by default 2 * log2(n)), the subarray is heapsorted, which bounds
+    the running time to O(n log(n)).
+    """
+    if max_depth is None:
+        max_depth = 2 * max(high - low + 1, 1).bit_length()
+
+    stack = [(low, high, max_depth)]
+    # The deepest the stack has been, counting the subarray being sorted
+    deepest = 1
+    while stack:
+        low, high, depth = stack.pop()
+        while low < high:
+            yield Event(PARTITION, low, high, low)
+            if depth == 0:
+                yield from heapsort(array, low, high)
+                break
+            depth -= 1
+
+            left, right = yield from partition_step(array, low, high)
+
+            # Keep the smaller partition and push the larger one
+            if left - low < high - right:
+                stack.append((right, high, depth))
+                high = left
+            else:
+                stack.append((low, left, depth))
+                low = right
+
+            if len(stack) + 1 > deepest:
+                deepest = len(stack) + 1
+                yield Event(DEPTH, low, high, deepest)
+
+
+def _lomuto_step(array, low, high):
+    if high - low >= 2:
+        yield from median_of_three(array, low, high)
+    pivot_index = yield from partition(array, low, high)
+    return pivot_index - 1, pivot_index + 1
+
+
+def introsort(array, low, high, max_depth=None):
+    """
+    Iterative quicksort with a median-of-three pivot, which falls back to
+    heapsort when the partitions are too unbalanced (see `_introsort_loop`).
+    """
+    yield from _introsort_loop(array, low, high, max_depth, _lomuto_step)
+
+
+def partition_three_way(array, low, high):
+    """
+    Three-way (Dutch national flag) partition of array[low..high] around the
+    last element.
+
+    Return `(lt, gt)` such that array[lt..gt] are equal to the pivot, the
+    elements before are smaller and the elements after are larger. Elements
+    equal to the pivot are never partitioned again, so inputs with many
+    duplicates are sorted in near-linear time.
+    """
+    pivot = array[high]
+    # array[low..lt-1] < pivot, array[lt..i-1] == pivot, array[gt+1..high-1] > pivot
+    lt, i, gt = low, low, high - 1
+    yield Event(PARTITION, low, high, lt)
+
+    while i <= gt:
+        yield Event(COMPARE, i, high)
+        if array[i] < pivot:
+            if lt != i:
+                yield Event(SWAP, lt, i)
+                array[lt], array[i] = array[i], array[lt]
+            lt += 1
+            i += 1
+        elif array[i] > pivot:
+            if i != gt:
+                yield Event(SWAP, i, gt)
+                array[i], array[gt] = array[gt], array[i]
+            gt -= 1
+        else:
+            i += 1
+        yield Event(EQUAL, lt, i - 1)
+
+    # Move the pivot next to the elements equal to it
+    gt += 1
+    if gt != high:
+        yield Event(SWAP, gt, high)
+        array[gt], array[high] = array[high], array[gt]
+    yield Event(EQUAL, lt, gt)
+
+    return lt, gt
+
+
+def _three_way_step(array, low, high):
+    if high - low >= 2:
+        yield from median_of_three(array, low, high)
+    lt, gt = yield from partition_three_way(array, low, high)
+    return lt - 1, gt + 1
+
+
+def quicksort_three_way(array, low, high, max_depth=None):
+    """
+    Iterative quicksort with a median-of-three pivot and a three-way partition,
+    with the same heapsort fallback as `introsort`.
+    """
+    yield from _introsort_loop(array, low, high, max_depth, _three_way_step)
+
+
+def partition_hoare(array, low, high):
+    """
+    Hoare partition of array[low..high] around its middle element (e.g. the
+    median of three, see `median_of_three`).
+
+    Return `split` such that every element of array[low..split] is smaller than
+    or equal to every element of array[split+1..high]. Two indexes scan from
+    both ends towards each other and swap the pairs in the wrong order, so
+    there are fewer swaps than in `partition` and duplicates are spread evenly
+    over both parts.
+    """
+    # The current position of the pivot, which may be swapped during the scan
+    pivot_index = (low + high) // 2
+    pivot = array[pivot_index]
+    i, j = low - 1, high + 1
+    yield Event(PARTITION, low, high, low)
+
+    while True:
+        i += 1
+        yield Event(COMPARE, i, pivot_index)
+        while array[i] < pivot:
+            i += 1
+            yield Event(COMPARE, i, pivot_index)
+
+        j -= 1
+        yield Event(COMPARE, j, pivot_index)
+        while array[j] > pivot:
+            j -= 1
+            yield Event(COMPARE, j, pivot_index)
+
+        if i >= j:
+            return j
+
+        yield Event(SWAP, i, j)
+        array[i], array[j] = array[j], array[i]
+        if pivot_index in (i, j):
+            pivot_index = j if pivot_index == i else i
+
+
+def _hoare_step(array, low, high):
+    if high - low >= 2:
+        yield from median_of_three(array, low, high, move_to_end=False)
+    split = yield from partition_hoare(array, low, high)
+    return split, split + 1
+
+
+def quicksort_hoare(array, low, high, max_depth=None):
+    """
+    Iterative quicksort with a median-of-three pivot and Hoare partition, with
+    the same heapsort fallback as `introsort`.
+    """
+    yield from _introsort_loop(array, low, high, max_depth, _hoare_step)
+
+
+def merge(array, buffer, low, mid, high):
+    """
+    Merge the sorted runs array[low..mid-1] and array[mid..high-1] through
+    `buffer`, which must be at least as long as `array`.
+    """
+    yield Event(PARTITION, low, high - 1, mid)
+
+    # Nothing to do if the two runs are already in order
+    yield Event(COMPARE, mid - 1, mid)
+    if array[mid - 1] <= array[mid]:
+        return
+
+    i, j = low, mid
+    for k in range(low, high):
+        if i < mid and j < high:
+            yield Event(COMPARE, i, j)
+            # Taking the left element on ties keeps the sort stable
+            take_left = array[i] <= array[j]
+        else:
+            take_left = i < mid
+
+        if take_left:
+            yield Event(BUFFER, k, i)
+            buffer[k] = array[i]
+            i += 1
+        else:
+            yield Event(BUFFER, k, j)
+            buffer[k] = array[j]
+            j += 1
+
+    # Copy the merged run back
+    for k in range(low, high):
+        yield Event(WRITE, k, value=buffer[k])
+        array[k] = buffer[k]
+
+
+def merge_sort(array):
+    """
+    Natural bottom-up merge sort.
+
+    The array is first split into its existing runs of non-decreasing
+    elements, then adjacent runs are merged pairwise until one run is left.
+    An already sorted array is a single run and is done after n - 1
+    comparisons. The auxiliary buffer is allocated only once.
+    """
+    n = len(array)
+
+    # The start of every run, followed by n
+    bounds = [0]
+    for i in range(1, n):
+        yield Event(COMPARE, i - 1, i)
+        if array[i - 1] > array[i]:
+            bounds.append(i)
+    bounds.append(n)
+
+    buffer = [None] * n
+    while len(bounds) > 2:
+        merged = [0]
+        for k in range(0, len(bounds) - 2, 2):
+            yield from merge(array, buffer, bounds[k], bounds[k + 1], bounds[k + 2])
+            merged.append(bounds[k + 2])
+
+        # An odd run out is left as it is for the next pass
+        if merged[-1] != n:
+            merged.append(n)
+        bounds = merged
+
+
+def _write_buckets(array, keys, output, num_buckets):
+    """
+    Write `output` (the elements of `array` ordered by their bucket in `keys`)
+    back to `array`, one bucket at a time.
+    """
+    # The range of positions of every bucket in the output
+    counts = np.bincount(keys, minlength=num_buckets)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+
+    for bucket, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        if start == end:
+            continue
+        yield Event(PARTITION, start, end - 1, bucket)
+        for k in range(start, end):
+            yield Event(WRITE, k, value=output[k])
+            array[k] = output[k]
+
+
+def counting_sort(array):
+    """
+    Counting sort for integers.
+
+    Every element goes into the bucket of its value (minus the smallest
+    value), then the buckets are written back in order. With k possible
+    values, the running time is O(n + k) without a single comparison.
+    """
+    if not array:
+        return
+
+    values = np.asarray(array)
+    keys = values - values.min()
+    for i, key in enumerate(keys.tolist()):
+        yield Event(BUCKET, i, value=key)
+
+    # Stable ordering by bucket
+    output = values[np.argsort(keys, kind="stable")].tolist()
+    yield from _write_buckets(array, keys, output, int(keys.max()) + 1)
+
+
+def radix_sort(array, base=10):
+    """
+    Least significant digit (LSD) radix sort for integers.
+
+    The elements are distributed into `base` buckets by their last digit, then
+    by the digit before it, and so on. Every pass is stable, so after the pass
+    of the most significant digit the array is sorted. With d digits, the
+    running time is O(d (n + base)).
+    """
+    if not array:
+        return
+
+    values = np.asarray(array)
+    # Shift the values so that they are all non-negative
+    low = values.min()
+    largest = int(values.max() - low)
+
+    exp = 1
+    while True:
+        digits = (values - low) // exp % base
+        for i, digit in enumerate(digits.tolist()):
+            yield Event(BUCKET, i, value=digit)
+
+        values = values[np.argsort(digits, kind="stable")]
+        yield from _write_buckets(array, digits, values.tolist(), base)
+
+        exp *= base
+        if exp > largest:
+            break
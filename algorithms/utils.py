@@ -6,8 +6,15 @@ __author__ = "Ahmed Hassan"
 __license__ = "MIT"
 __email__ = "ahmedhassan@aims.ac.za"
 
+import sys
+import time
 
+import display
+import numpy as np
 import pygame
+import sorting
+from display import glyphs
+from instrumentation import OpCounter, StageTimer, save_stats
 
 BLACK = (0, 0, 0)
 BLUE = (58, 148, 255)
@@ -17,6 +24,98 @@ RED = (255, 0, 0)
 GOLDEN_YELLOW = (255, 215, 0)
 GREEN = (50, 205, 50)
 
+# Times the drawing functions of this module, frame by frame (disabled by default)
+timings = StageTimer()
+
+
+class StatsOverlay:
+    """
+    Draw the operation counts of `counter` (an `instrumentation.OpCounter`) and
+    the render timings of the last frame in the top-left corner of the screen.
+
+    The overlay is drawn over every frame while `visible` is True (press S to
+    toggle it while a `Scheduler` is running).
+    """
+
+    def __init__(self, timer, counter=None, font_size=22):
+        self.timer = timer
+        self.counter = counter
+        self.font_size = font_size
+        self.visible = False
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.timer.enabled = True
+
+    def draw(self, screen):
+        """
+        Draw the overlay on `screen` and return the area it covers (None if
+        there is nothing to show).
+        """
+        lines = []
+        if self.counter is not None:
+            stats = self.counter.as_dict()
+            lines += [f"{name}: {value}" for name, value in stats.items() if value]
+        for stage, seconds in self.timer.last_frame.items():
+            lines.append(f"{stage}: {1000 * seconds:.2f} ms")
+        if not lines:
+            return None
+
+        font = glyphs.font(self.font_size)
+        texts = [glyphs.render(line, WHITE, font) for line in lines]
+        margin = 5
+        line_height = font.get_linesize()
+        width = max(text.get_width() for text in texts) + 2 * margin
+        height = len(texts) * line_height + 2 * margin
+        rect = pygame.draw.rect(screen, BLACK, (0, 0, width, height))
+        for k, text in enumerate(texts):
+            screen.blit(text, (margin, margin + k * line_height))
+        return rect
+
+
+# Counts the operations of the sort being animated (see `run_sort`)
+counter = OpCounter()
+
+# Shared by all renderers
+overlay = StatsOverlay(timings, counter)
+
+
+class Scheduler(display.Scheduler):
+    """
+    A `display.Scheduler` where S also toggles the statistics `overlay`.
+    """
+
+    def __init__(self, clock=None, fps=60, speed=1.0, key_bindings=None):
+        key_bindings = {pygame.K_s: overlay.toggle, **(key_bindings or {})}
+        super().__init__(clock, fps, speed, key_bindings)
+
+
+def _present(clock, speed, rects=None):
+    """
+    Update the display (only the list of areas `rects` if provided), with the
+    overlay on top if it is visible, and wait for the next frame if `clock` is
+    given. The area of the overlay is always updated, so it stays on top of the
+    elements moving under it.
+
+    This closes a frame in `timings`: the update is timed as the "flip" stage
+    and the wait as the "wait" stage.
+    """
+    with timings.stage("flip"):
+        overlay_rect = None
+        if overlay.visible:
+            overlay_rect = overlay.draw(pygame.display.get_surface())
+        if rects is None:
+            pygame.display.flip()
+        elif overlay_rect is not None:
+            pygame.display.update(rects + [overlay_rect])
+        else:
+            pygame.display.update(rects)
+    if clock is not None:
+        with timings.stage("wait"):
+            clock.tick(speed)
+    timings.end_frame()
+
 
 def connect_two_array_elments(
     idx1, idx2, y, screen, rect_width, rect_height, color=GOLDEN_YELLOW
@@ -50,6 +149,73 @@ def connect_two_array_elments(
     )
 
 
+def _index_flags(indexes, n):
+    """
+    Turn `indexes` into `n` per-element flags, so the drawing loops can look up
+    whether element `i` is flagged in O(1).
+
+    `indexes` is either a list of indexes or a `range` (e.g. the current
+    subarray), which is flagged in one slice assignment.
+    """
+    flags = bytearray(n)
+    if not indexes:
+        return flags
+    if isinstance(indexes, range) and indexes.step == 1:
+        start, stop = max(indexes.start, 0), min(indexes.stop, n)
+        flags[start:stop] = b"\x01" * max(stop - start, 0)
+    else:
+        for i in indexes:
+            flags[i] = 1
+    return flags
+
+
+def _draw_element(screen, val, x, y, rect_width, rect_height, font, color=WHITE):
+    """
+    Draw a single array element: a square of `color` with `val` in its middle.
+    """
+    pygame.draw.rect(screen, color, (x, y, rect_width, rect_height))
+    text = glyphs.render(str(val), BLACK, font)
+    text_rect = text.get_rect(center=(x + rect_width // 2, y + rect_height // 2))
+    screen.blit(text, text_rect)
+
+
+@timings.timed("background")
+def _background(
+    array,
+    moving,
+    y,
+    screen,
+    rect_width,
+    rect_height,
+    font,
+    lift_indexes=None,
+    backdrop=None,
+):
+    """
+    Draw every element except the `moving` ones (a list or a range of indexes)
+    on a new surface, over `backdrop` if provided.
+
+    The surface stays valid for a whole swap or shift since the other elements
+    do not move.
+    """
+    if backdrop is not None:
+        background = backdrop.copy()
+    else:
+        background = pygame.Surface(screen.get_size())
+        background.fill(BLACK)
+    y_orig = y
+    y_lift = y - rect_height
+    lifted = _index_flags(lift_indexes, len(array))
+    skipped = _index_flags(moving, len(array))
+    for i, val in enumerate(array):
+        if skipped[i]:
+            continue
+        y = y_lift if lifted[i] else y_orig
+        _draw_element(background, val, i * rect_width, y, rect_width, rect_height, font)
+    return background
+
+
+@timings.timed("animate_swap")
 def _animate_swap(
     array,
     idx1,
@@ -64,46 +230,44 @@ def _animate_swap(
     font,
     highlight_color=RED,
     lift_indexes=None,
+    backdrop=None,
 ):
     """
     Perform the swapping move of the two elements at index `idx1` and `idx2` in `array`
     """
-    screen.fill(BLACK)
+    if backdrop is not None:
+        screen.blit(backdrop, (0, 0))
+    else:
+        screen.fill(BLACK)
     x1, x2, y1, y2 = coord
     y_orig = y
     y_lift = y - rect_height
+    lifted = _index_flags(lift_indexes, len(array))
     for i, val in enumerate(array):
         x = i * rect_width
-        y = y_lift if lift_indexes and i in lift_indexes else y_orig
+        y = y_lift if lifted[i] else y_orig
         if i == idx1:
-            pygame.draw.rect(screen, highlight_color, (x1, y1, rect_width, rect_height))
-            text = font.render(str(array[i]), True, BLACK)
-            text_rect = text.get_rect(
-                center=(x1 + rect_width // 2, y1 + rect_height // 2)
+            _draw_element(
+                screen, val, x1, y1, rect_width, rect_height, font, highlight_color
             )
         elif i == idx2:
-            pygame.draw.rect(screen, highlight_color, (x2, y2, rect_width, rect_height))
-            text = font.render(str(array[i]), True, BLACK)
-            text_rect = text.get_rect(
-                center=(x2 + rect_width // 2, y2 + rect_height // 2)
+            _draw_element(
+                screen, val, x2, y2, rect_width, rect_height, font, highlight_color
             )
         else:
-            pygame.draw.rect(screen, WHITE, (x, y, rect_width, rect_height))
-            text = font.render(str(val), True, BLACK)
-            text_rect = text.get_rect(
-                center=(x + rect_width // 2, y + rect_height // 2)
-            )
-        screen.blit(text, text_rect)
+            _draw_element(screen, val, x, y, rect_width, rect_height, font)
 
-    pygame.display.flip()
-    clock.tick(speed)
+    _present(clock, speed)
 
 
-def animate_swap(
+@timings.timed("animate_swap")
+def _animate_swap_dirty(
     array,
     idx1,
     idx2,
-    y,
+    coord,
+    background,
+    previous_rects,
     screen,
     rect_width,
     rect_height,
@@ -111,10 +275,36 @@ def animate_swap(
     speed,
     font,
     highlight_color=RED,
-    lift_indexes=None,
 ):
     """
-    Animate swaping the two elments at position `idx1` and `idx2` in `array`
+    Same as `_animate_swap` but only redraws the two moving elements.
+
+    The areas covered by the elements in the previous frame (`previous_rects`)
+    are restored from `background` and only the changed areas are sent to the
+    display. Return the areas covered by the elements in this frame.
+    """
+    x1, x2, y1, y2 = coord
+    for rect in previous_rects:
+        screen.blit(background, rect, rect)
+
+    rects = [
+        pygame.Rect(x1, y1, rect_width, rect_height),
+        pygame.Rect(x2, y2, rect_width, rect_height),
+    ]
+    _draw_element(
+        screen, array[idx1], x1, y1, rect_width, rect_height, font, highlight_color
+    )
+    _draw_element(
+        screen, array[idx2], x2, y2, rect_width, rect_height, font, highlight_color
+    )
+
+    _present(clock, speed, previous_rects + rects)
+    return rects
+
+
+def _swap_path(idx1, idx2, y, rect_width, rect_height, lift_indexes=None):
+    """
+    Yield the positions `(x1, x2, y1, y2)` of the two swapped elements, one per frame.
     """
     # Initial positions of the two squares
     target_y = y - rect_height if lift_indexes else y
@@ -136,22 +326,7 @@ def animate_swap(
         if y2 < target_y + rect_height:
             y2 += 1
 
-        # Draw the elements
-        _animate_swap(
-            array,
-            idx1,
-            idx2,
-            (x1, x2, y1, y2),
-            y,
-            screen,
-            rect_width,
-            rect_height,
-            clock,
-            speed,
-            font,
-            highlight_color,
-            lift_indexes,
-        )
+        yield x1, x2, y1, y2
 
     # Move the elements horizontally towards their target x positions
     while x1 != target_x1 or x2 != target_x2:
@@ -165,21 +340,7 @@ def animate_swap(
         elif x2 > target_x2:
             x2 -= 1
 
-        _animate_swap(
-            array,
-            idx1,
-            idx2,
-            (x1, x2, y1, y2),
-            y,
-            screen,
-            rect_width,
-            rect_height,
-            clock,
-            speed,
-            font,
-            highlight_color,
-            lift_indexes,
-        )
+        yield x1, x2, y1, y2
 
     # After reaching target x, move back vertically to their target positions
     while y1 < target_y1 or y2 > target_y2:
@@ -189,26 +350,220 @@ def animate_swap(
         if y2 > target_y2:
             y2 -= 1
 
-        _animate_swap(
+        yield x1, x2, y1, y2
+
+
+def _swap_tween(idx1, idx2, y, rect_width, rect_height, duration, lift_indexes=None):
+    """
+    Yield the positions `(x1, x2, y1, y2)` of the two swapped elements based on
+    the elapsed time, so the whole swap takes `duration` seconds.
+
+    The elements follow the same path as in `_swap_path` (up/down, across, and
+    back) at a constant speed. If drawing a frame takes longer than expected,
+    the positions in between are simply skipped.
+    """
+    target_y = y - rect_height if lift_indexes else y
+    x1, x2 = idx1 * rect_width, idx2 * rect_width
+    dx = x2 - x1
+
+    # Length of the three parts of the path
+    total = 2 * rect_height + abs(dx)
+
+    start = time.perf_counter()
+    while True:
+        elapsed = time.perf_counter() - start
+        progress = min(elapsed / duration, 1.0) if duration > 0 else 1.0
+        distance = progress * total
+
+        if distance < rect_height:
+            offset_y, offset_x = distance, 0
+        elif distance < rect_height + abs(dx):
+            offset_y, offset_x = rect_height, distance - rect_height
+        else:
+            offset_y, offset_x = total - distance, abs(dx)
+
+        offset_x = offset_x if dx >= 0 else -offset_x
+        yield (
+            round(x1 + offset_x),
+            round(x2 - offset_x),
+            round(target_y - offset_y),
+            round(target_y + offset_y),
+        )
+
+        if progress == 1.0:
+            return
+
+
+def animate_swap(
+    array,
+    idx1,
+    idx2,
+    y,
+    screen,
+    rect_width,
+    rect_height,
+    clock,
+    speed,
+    font,
+    highlight_color=RED,
+    lift_indexes=None,
+    dirty_rects=True,
+    duration=None,
+    backdrop=None,
+):
+    """
+    Animate swaping the two elments at position `idx1` and `idx2` in `array`
+
+    Parameter
+    ---------
+    dirty_rects: bool
+        If True, the elements that do not move are drawn only once per swap and
+        each frame updates just the areas covered by the two moving elements.
+        Otherwise, the whole array is redrawn for every frame.
+    duration: float
+        If provided, the swap takes `duration` seconds regardless of the
+        distance between the two elements, dropping frames if the drawing is
+        too slow. Otherwise, the elements move one pixel per frame.
+    backdrop: pygame.Surface
+        If provided, the array is drawn over this surface (e.g. another view of
+        the same data) instead of a black screen.
+    """
+    if dirty_rects:
+        background = _background(
             array,
-            idx1,
-            idx2,
-            (x1, x2, y1, y2),
+            [idx1, idx2],
             y,
             screen,
             rect_width,
             rect_height,
-            clock,
-            speed,
             font,
-            highlight_color,
             lift_indexes,
+            backdrop,
         )
+        screen.blit(background, (0, 0))
+        _present(None, speed)
+        rects = []
+
+    if duration is not None:
+        path = _swap_tween(
+            idx1, idx2, y, rect_width, rect_height, duration, lift_indexes
+        )
+    else:
+        path = _swap_path(idx1, idx2, y, rect_width, rect_height, lift_indexes)
+
+    for coord in path:
+        if dirty_rects:
+            rects = _animate_swap_dirty(
+                array,
+                idx1,
+                idx2,
+                coord,
+                background,
+                rects,
+                screen,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_color,
+            )
+        else:
+            _animate_swap(
+                array,
+                idx1,
+                idx2,
+                coord,
+                y,
+                screen,
+                rect_width,
+                rect_height,
+                clock,
+                speed,
+                font,
+                highlight_color,
+                lift_indexes,
+                backdrop,
+            )
 
     # Finalize the swap in the array
     array[idx1], array[idx2] = array[idx2], array[idx1]
 
 
+def animate_shift(
+    array,
+    start,
+    end,
+    y,
+    screen,
+    rect_width,
+    rect_height,
+    clock,
+    speed,
+    font,
+    highlight_color=RED,
+    duration=0.5,
+):
+    """
+    Animate moving the element at index `end` to index `start` while the
+    elements array[start..end-1] slide one position to the right, all at once.
+
+    The moving element is lifted, carried over the sliding block and dropped
+    in its place. Like `animate_swap(duration=...)`, the whole move takes
+    `duration` seconds, and only the area covering array[start..end] is
+    redrawn for every frame.
+    """
+    background = _background(
+        array, range(start, end + 1), y, screen, rect_width, rect_height, font
+    )
+    screen.blit(background, (0, 0))
+    _present(None, speed)
+
+    # The area covered by the moving elements
+    area = pygame.Rect(
+        start * rect_width,
+        y - rect_height,
+        (end - start + 1) * rect_width,
+        2 * rect_height,
+    )
+    distance = (end - start) * rect_width
+
+    start_time = time.perf_counter()
+    while True:
+        elapsed = time.perf_counter() - start_time
+        progress = min(elapsed / duration, 1.0) if duration > 0 else 1.0
+
+        # Lift (first third), slide (second third) and drop (last third)
+        lift = min(progress * 3, 1.0) - max(progress * 3 - 2, 0.0)
+        slide = min(max(progress * 3 - 1, 0.0), 1.0)
+
+        with timings.stage("animate_shift"):
+            screen.blit(background, area, area)
+            for i in range(start, end):
+                x = i * rect_width + round(slide * rect_width)
+                _draw_element(screen, array[i], x, y, rect_width, rect_height, font)
+            _draw_element(
+                screen,
+                array[end],
+                end * rect_width - round(slide * distance),
+                y - round(lift * rect_height),
+                rect_width,
+                rect_height,
+                font,
+                highlight_color,
+            )
+        _present(clock, speed, [area])
+
+        if progress == 1.0:
+            break
+
+    # Finalize the shift in the array
+    value = array[end]
+    array[start + 1 : end + 1] = array[start:end]
+    array[start] = value
+
+
+@timings.timed("draw_array")
 def draw_array(
     array,
     screen,
@@ -225,21 +580,28 @@ def draw_array(
     lift_indexes=None,
     connect_indexes=None,
     erase=True,
+    flip=True,
 ):
     """
-    Draw an array.
+    Draw an array. Elements that are None (e.g. empty slots of a buffer) are
+    not drawn.
 
     Parameter
     ---------
-    highlight_indexes: List[int]
+    highlight_indexes: List[int] or range
         The indexes of the elements to highlight with `highlight_color`
     highlight_color: Tuple(int, int, int)
         RGB color
     pivot_index: int
         The index of the pivot (i.e. the partition index).
-    lift_indexes: List[int]
+    lift_indexes: List[int] or range
         The indexes in the current sub-array (partition) that should be lifted
         slightly above of the rest of the array
+    erase: bool
+        Clear the screen before drawing
+    flip: bool
+        Update the display after drawing. Set `erase` and `flip` to False to
+        draw several arrays (e.g. rows) in the same frame.
 
     NOTE
     `pivot_index` and `lift_indexes` are only relevant for divide and conquer
@@ -252,27 +614,28 @@ def draw_array(
     y_orig = y
     y_lift = y - rect_height
 
+    lifted = _index_flags(lift_indexes, len(array))
+    highlighted = _index_flags(highlight_indexes, len(array))
+
     for i, val in enumerate(array):
+        if val is None:
+            continue
+
         # (x, y) coordinate of the current element
         x = i * rect_width
 
-        y = y_lift if lift_indexes and i in lift_indexes else y_orig
+        y = y_lift if lifted[i] else y_orig
 
         # Highlight the elements
-        if highlight_indexes and i in highlight_indexes:
+        if highlighted[i]:
             color = highlight_color  # or GOLDEN_YELLOW
         elif pivot_index and i == pivot_index:
             color = pivot_color  # or BLUE
         else:
             color = WHITE
 
-        # Draw currnet element
-        pygame.draw.rect(screen, color, (x, y, rect_width, rect_height))
-
-        # Display the value in the middle of each square
-        text = font.render(str(val), True, BLACK)
-        text_rect = text.get_rect(center=(x + rect_width // 2, y + rect_height // 2))
-        screen.blit(text, text_rect)
+        # Draw currnet element with its value in the middle
+        _draw_element(screen, val, x, y, rect_width, rect_height, font, color)
 
     if connect_indexes:
         connect_two_array_elments(
@@ -285,5 +648,171 @@ def draw_array(
             color=highlight_color,
         )
 
-    pygame.display.flip()
-    clock.tick(speed)
+    if flip:
+        _present(clock, speed)
+
+
+@timings.timed("draw_bars")
+def draw_bars(
+    values,
+    screen,
+    clock,
+    speed,
+    max_value,
+    highlight_indexes=None,
+    color=WHITE,
+    band_color=LIGHT_BLUE,
+    highlight_color=RED,
+    flip=True,
+    min_value=None,
+):
+    """
+    Draw a large array as vertical bars, writing directly into the screen pixels.
+
+    Used when the array is too large to draw one labelled square per element.
+    Every pixel column shows the elements that fall in it: a bar of `color` up
+    to the smallest value and a band of `band_color` up to the largest one.
+    If there are fewer elements than columns, each element spans several columns.
+
+    Parameter
+    ---------
+    values: numpy.ndarray
+        The array to draw
+    max_value: int
+        The value drawn with the full screen height
+    highlight_indexes: List[int]
+        The indexes of the elements to highlight with `highlight_color`
+    flip: bool
+        Update the display after drawing. Set it to False to draw several
+        arrays in the same frame, each on a subsurface of the screen.
+    min_value: int
+        The value drawn with no height (by default, 0 or the smallest value
+        if it is negative)
+    """
+    width, height = screen.get_size()
+    n = len(values)
+
+    # The first element in every pixel column
+    starts = (np.arange(width) * n) // width
+    highest = np.maximum.reduceat(values, starts)
+    lowest = np.minimum.reduceat(values, starts)
+
+    # The y coordinate of the top of the bars, measured from `min_value`
+    if min_value is None:
+        min_value = min(lowest.min(), 0)
+    scale = (height - 1) / max(max_value - min_value, 1)
+    top_high = height - ((highest - min_value) * scale).astype(np.intp)
+    top_low = height - ((lowest - min_value) * scale).astype(np.intp)
+
+    rows = np.arange(height)
+    pixels = pygame.surfarray.pixels3d(screen)
+    pixels[:] = BLACK
+    pixels[rows >= top_high[:, None]] = band_color
+    pixels[rows >= top_low[:, None]] = color
+
+    if highlight_indexes:
+        # Column c holds the elements starts[c] <= i < ends[c]
+        ends = np.maximum(np.append(starts[1:], n), starts + 1)
+        for i in highlight_indexes:
+            for c in np.flatnonzero((starts <= i) & (i < ends)):
+                pixels[c, top_high[c] :] = highlight_color
+
+    # Release the lock on the screen before updating the display
+    del pixels
+
+    if flip:
+        _present(clock, speed)
+
+
+def animate_bars(steps, array, screen, clock, speed, events_per_frame=None):
+    """
+    Replay the events of a sorting algorithm (see `sorting.py`) on `array`,
+    drawing it as bars with `draw_bars`.
+
+    Only one frame is drawn every `events_per_frame` events (by default, one per
+    `len(array)` events), highlighting the elements of the last event.
+    """
+    values = np.array(array)
+    max_value = values.max() if len(values) else 1
+    events_per_frame = events_per_frame or max(1, len(values))
+
+    for count, event in enumerate(steps, 1):
+        sorting.apply_event(values, event)
+        if count % events_per_frame:
+            continue
+
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+
+        draw_bars(
+            values,
+            screen,
+            clock,
+            speed,
+            max_value,
+            highlight_indexes=[event.i, event.j],
+        )
+
+    draw_bars(values, screen, clock, speed, max_value, color=GREEN, band_color=GREEN)
+    array[:] = values.tolist()
+
+
+def open_window(caption, size):
+    """
+    Initialize pygame, open a window of `size` (a (width, height) pair) titled
+    `caption` and return its surface.
+
+    NOTE nothing is initialized when the scripts are imported: they call this
+    from their `setup` function, itself called by their `main`.
+    """
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(caption)
+    return screen
+
+
+def run_sort(
+    animation,
+    sort,
+    array,
+    screen,
+    clock,
+    speed,
+    scheduler,
+    labelled=True,
+    stats_file=None,
+):
+    """
+    Run the animation of a sorting script, then wait until the window is closed.
+
+    If `labelled`, `animation` (a generator counting the events of its sort
+    with `counter`) is run by `scheduler`. Otherwise there are too many
+    elements to label: the events of `sort` (a function sorting the array it
+    is given, e.g. `sorting.merge_sort`) are drawn as bars instead.
+
+    If `stats_file` (".json" or ".csv") is given, the render timings are
+    enabled and saved to it, with the operation counts, at the end of the run
+    (see `instrumentation.save_stats`).
+    """
+    if stats_file:
+        timings.enabled = True
+
+    if labelled:
+        # Few enough events to measure the recursion depth at every one of them
+        counter.depth_interval = 1
+        scheduler.run(animation)
+    else:
+        animate_bars(counter.count(sort(array[:])), array, screen, clock, speed)
+
+    if stats_file:
+        save_stats(stats_file, counter, timings)
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+    pygame.quit()
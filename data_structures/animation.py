@@ -6,11 +6,11 @@ NOTE if the codebase grows, consider refactoring this module
 
 import math
 import sys
-import time
 from collections import namedtuple
 
 import pygame
 from tree import AVLTree, BinaryTreeNode, Tree
+from utils import Scheduler, glyphs
 
 BLACK = (0, 0, 0)
 GRAY = (150, 150, 150)
@@ -38,7 +38,7 @@ class Setting:
         # Font
         self.font_color = WHITE
         self.font_size = 36
-        self.font = pygame.font.Font(None, self.font_size)
+        self.font = glyphs.font(self.font_size)
 
         # Animation speed
         self.fps = 30
@@ -86,6 +86,9 @@ class DataStrucAnimator:
         if title:
             pygame.display.set_caption(title)
 
+        # Runs the animations (see `animate_insert`) without freezing the window
+        self.scheduler = Scheduler(fps=self.setting.fps)
+
     def check_events(self):
         # Quit animation by clicking the exit button or pressing 'q' in keyboard
         for event in pygame.event.get():
@@ -157,7 +160,7 @@ class TreeAnimator(DataStrucAnimator):
         edge_color = edge_color or self.setting.edge_color
         pygame.draw.circle(screen, edge_color, (x, y), self.setting.node_radius, 3)
         font = font or self.setting.font
-        text = font.render(str(node.value), True, self.setting.font_color)
+        text = glyphs.render(str(node.value), self.setting.font_color, font)
         text_rect = text.get_rect(center=(x, y))
         screen.blit(text, text_rect)
 
@@ -283,6 +286,12 @@ class BinarySearchTreeAnimator(TreeAnimator):
         pass
 
     def animate_insert(self, value):
+        """
+        Animate inserting `value` into the tree.
+
+        Yield the delays between the steps, so the animation is meant to be run
+        by `self.scheduler`.
+        """
         # Create a node
         new_node = BinaryTreeNode(value)
 
@@ -308,7 +317,7 @@ class BinarySearchTreeAnimator(TreeAnimator):
         self._draw_tree(static_surface)
         self.screen.blit(static_surface, (0, 0))
         pygame.display.flip()
-        time.sleep(self.setting.delay)
+        yield self.setting.delay
 
         # Start from the root
         current_node = self.tree.root
@@ -353,7 +362,7 @@ class BinarySearchTreeAnimator(TreeAnimator):
                 # Show the inequality symbol next to the node
                 ineq_symbol = "<" if new_node.value < current_node.value else ">"
                 # font = pygame.font.Font(None, int(new_node.radius * 2.5))
-                text = self.setting.font.render(ineq_symbol, True, WHITE)
+                text = glyphs.render(ineq_symbol, WHITE, self.setting.font)
                 text_rect = text.get_rect(
                     center=((x + current_node.x) // 2, (y + current_node.y) // 2)
                 )
@@ -362,7 +371,7 @@ class BinarySearchTreeAnimator(TreeAnimator):
                 self.setting.clock.tick(self.setting.fps)
 
                 # More patience here!
-                time.sleep(2 * self.setting.delay)
+                yield 2 * self.setting.delay
 
             # Move from current node to next node
             step = self.step_size(current_pos, next_pos)
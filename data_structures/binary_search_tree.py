@@ -16,14 +16,15 @@ import sys
 import time
 
 import pygame
+from utils import glyphs
 
-# Initialize Pygame
-pygame.init()
+# NOTE nothing is initialized when the module is imported (e.g. by
+# `tree_traversal.py`): `setup` (called by `main`) initializes pygame and opens
+# the window
 
 # Screen dimensions
 screen_width, screen_height = 1200, 900
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Binary Search Tree")
+screen = None
 
 # Colors
 BLACK = (0, 0, 0)
@@ -197,8 +198,8 @@ def draw_node(node, screen, xy=None, node_color=RED, border_color=WHITE, font=No
     y = node.y if xy is None else xy[1]
     pygame.draw.circle(screen, node_color, (x, y), radius)
     pygame.draw.circle(screen, border_color, (x, y), radius, 3)  # Border
-    font = font or pygame.font.Font(None, int(radius * 1.5))
-    text = font.render(str(node.value), True, WHITE)
+    font = font or glyphs.font(int(radius * 1.5))
+    text = glyphs.render(str(node.value), WHITE, font)
     text_rect = text.get_rect(center=(x, y))
     screen.blit(text, text_rect)
 
@@ -297,8 +298,8 @@ def animate_node_insertion(new_node, sequence, screen, anim_steps=2):
 
                 # Show the inequality symbo next to the node
                 ineq_symbol = "<" if new_node.value < current_node.value else ">="
-                font = pygame.font.Font(None, int(radius * 2.5))  ### Global font
-                text = font.render(ineq_symbol, True, WHITE)
+                font = glyphs.font(int(radius * 2.5))
+                text = glyphs.render(ineq_symbol, WHITE, font)
                 text_rect = text.get_rect(
                     center=((x + current_node.x) // 2, (y + current_node.y) // 2)
                 )
@@ -354,7 +355,20 @@ def create_bst_tree(random_numbers):
     pygame.display.flip()
 
 
+def setup():
+    """
+    Initialize pygame and open the window.
+    """
+    global screen
+
+    pygame.init()
+    screen = pygame.display.set_mode((screen_width, screen_height))
+    pygame.display.set_caption("Binary Search Tree")
+
+
 def main():
+    setup()
+
     running = True
     constructed = False
 
@@ -32,7 +32,7 @@ def animate_binary_tree_insert(num_nodes):
         if not anim_done:
             for value in values:
                 print("inserting ", value)
-                bst_animator.animate_insert(value)
+                bst_animator.scheduler.run(bst_animator.animate_insert(value))
 
         anim_done = True
 
@@ -8,19 +8,18 @@ __email__ = "ahmedhassan@aims.ac.za"
 
 import random
 import sys
-import time
 from collections import deque
 
 import pygame
 from binary_search_tree import NodeStatus, draw_tree, insert_node, balance_array_for_bst
+from utils import Scheduler
 
-# Initialize Pygame
-pygame.init()
+# NOTE nothing is initialized when the module is imported: `setup` (called by
+# `main`) initializes pygame and opens the window
 
 # Screen dimensions
 screen_width, screen_height = 1200, 600
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Tree Traversal Algorithms")
+screen = None
 
 
 # # Number of nodes
@@ -34,6 +33,8 @@ node_sequence = []
 clock = pygame.time.Clock()
 SPEED = 360  # frame rate
 DELAY = 0.9  # seconds
+# Runs the traversals and keeps the window responsive during the delays
+scheduler = Scheduler(clock)
 
 
 def create_bst_tree_from_array(array):
@@ -44,13 +45,6 @@ def create_bst_tree_from_array(array):
     return root
 
 
-def handle_events():
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-
-
 def inorder(node):
 
     if node is None:
@@ -59,16 +53,16 @@ def inorder(node):
     draw_tree(screen)
     pygame.display.flip()
     clock.tick(SPEED)
-    time.sleep(DELAY)
+    yield DELAY
 
     if node.left:
         node.left.status = NodeStatus.VISITED
         draw_tree(screen)
         pygame.display.flip()
         clock.tick(SPEED)
-        time.sleep(DELAY)
+        yield DELAY
 
-    inorder(node.left)
+    yield from inorder(node.left)
 
     node.status = NodeStatus.ACCESSED
 
@@ -77,15 +71,16 @@ def inorder(node):
         draw_tree(screen)
         pygame.display.flip()
         clock.tick(SPEED)
-        time.sleep(DELAY)
+        yield DELAY
 
-    inorder(node.right)
+    yield from inorder(node.right)
 
 
 def inorder(node):
     """
     Perform an inorder traversal while animating the process.
     Each node's status is updated and the tree is redrawn at each step.
+    Yield the delays between the steps (see `Scheduler`).
     """
     if node is None:
         return
@@ -94,29 +89,26 @@ def inorder(node):
     node.status = NodeStatus.VISITED
     draw_tree(screen)
     pygame.display.flip()
-    time.sleep(DELAY)
-    # pygame.time.delay(DELAY)
-    handle_events()
+    yield DELAY
 
     # Recur on left subtree
-    inorder(node.left)
+    yield from inorder(node.left)
 
     # Mark node as visited (processing current node)
     node.status = NodeStatus.ACCESSED
     draw_tree(screen)
     pygame.display.flip()
-    time.sleep(DELAY)
-    # pygame.time.delay(DELAY)
-    handle_events()
+    yield DELAY
 
     # Recur on right subtree
-    inorder(node.right)
+    yield from inorder(node.right)
 
 
 def preorder(node):
     """
     Perform a preorder traversal while animating the process.
     Each node's status is updated and the tree is redrawn at each step.
+    Yield the delays between the steps (see `Scheduler`).
     """
     if node is None:
         return
@@ -125,56 +117,54 @@ def preorder(node):
     node.status = NodeStatus.VISITED
     draw_tree(screen)
     pygame.display.flip()
-    time.sleep(DELAY)
-    handle_events()
+    yield DELAY
 
     # Mark node as visited
     node.status = NodeStatus.ACCESSED
     draw_tree(screen)
     pygame.display.flip()
-    time.sleep(DELAY)
-    handle_events()
+    yield DELAY
 
     # Recur on left subtree
-    preorder(node.left)
+    yield from preorder(node.left)
 
     # Recur on right subtree
-    preorder(node.right)
+    yield from preorder(node.right)
 
 
 def postorder(node):
     """
     Perform a postorder traversal while animating the process.
     Each node's status is updated and the tree is redrawn at each step.
+    Yield the delays between the steps (see `Scheduler`).
     """
     if node is None:
         return
 
     # Recur on left subtree
-    postorder(node.left)
+    yield from postorder(node.left)
 
     # Recur on right subtree
-    postorder(node.right)
+    yield from postorder(node.right)
 
     # Mark node as visiting (processing current node)
     node.status = NodeStatus.VISITED
     draw_tree(screen)
     pygame.display.flip()
-    time.sleep(DELAY)
-    handle_events()
+    yield DELAY
 
     # Mark node as visited
     node.status = NodeStatus.ACCESSED
     draw_tree(screen)
     pygame.display.flip()
-    time.sleep(DELAY)
-    handle_events()
+    yield DELAY
 
 
 def level_order(node):
     """
     Perform a level-order traversal (breadth-first search) while animating the process.
     Each node's status is updated, and the tree is redrawn at each step.
+    Yield the delays between the steps (see `Scheduler`).
     """
     if node is None:
         return
@@ -189,15 +179,13 @@ def level_order(node):
         current.status = NodeStatus.VISITED
         draw_tree(screen)
         pygame.display.flip()
-        time.sleep(DELAY)
-        handle_events()
+        yield DELAY
 
         # Mark the current node as visited
         current.status = NodeStatus.ACCESSED
         draw_tree(screen)
         pygame.display.flip()
-        time.sleep(DELAY)
-        handle_events()
+        yield DELAY
 
         # Enqueue left child if it exists
         if current.left:
@@ -208,14 +196,27 @@ def level_order(node):
             queue.append(current.right)
 
 
+def setup():
+    """
+    Initialize pygame and open the window.
+    """
+    global screen
+
+    pygame.init()
+    screen = pygame.display.set_mode((screen_width, screen_height))
+    pygame.display.set_caption("Tree Traversal Algorithms")
+
+
 def main(root, tree_traveral):
+    setup()
+
     running = True
     constructed = False
 
     draw_tree(screen)
     pygame.display.flip()
     clock.tick(SPEED)
-    time.sleep(DELAY)
+    scheduler.wait(DELAY)
 
     while running:
         for event in pygame.event.get():
@@ -225,7 +226,7 @@ def main(root, tree_traveral):
                 sys.exit()
 
         if not constructed:
-            tree_traveral(root)
+            scheduler.run(tree_traveral(root))
             constructed = True
 
         draw_tree(screen)
@@ -1,3 +1,16 @@
 """
-A placeholder for utilities for data structures if needed
+Utilities for data structures
 """
+
+import os
+import sys
+
+# The glyph cache and the scheduler are shared with the algorithms, which are a
+# separate script root: make their modules importable from here. Only
+# `algorithms/display.py` is imported, which depends on nothing but pygame (the
+# sorts and their instrumentation are not loaded)
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "algorithms")
+)
+
+from display import Scheduler, glyphs  # noqa: E402